@@ -0,0 +1,41 @@
+"""Neustart-Szenario: ein bekannter Monat ohne und mit Arrow-Cache.
+
+Aufruf: python benchmarks/bench_arrow_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.synthetic import make_reports  # noqa: E402
+from monatsanalyse import arrow_cache  # noqa: E402
+from monatsanalyse.pipeline import build_report, read_reports, reduce_partials  # noqa: E402
+
+def timed(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{name:<34} {(time.perf_counter() - start) * 1000:8.1f} ms")
+    return result
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name, df in make_reports(n_days=22):
+            paths.append(os.path.join(tmp, name))
+            df.to_excel(paths[-1], index=False)
+        cache_dir = os.path.join(tmp, 'arrow')
+        digests = [arrow_cache.file_hash(p) for p in paths]
+
+        timed("Excel einlesen + Report", lambda: build_report(read_reports(paths)))
+        timed("erster Lauf (Excel + Cache füllen)", lambda: reduce_partials(
+            [arrow_cache.cached_partial(p, d, cache_dir) for p, d in zip(paths, digests)]))
+        timed("Neustart: Teilsummen per mmap", lambda: reduce_partials(
+            [arrow_cache.cached_partial(p, d, cache_dir) for p, d in zip(paths, digests)]))
+        timed("Neustart: Roh-Reports per mmap", lambda: [
+            arrow_cache.load_frame(arrow_cache.entry_key(p, d), 'report', cache_dir)
+            for p, d in zip(paths, digests)])
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Kaltstart-Importzeit von App und CLI per `python -X importtime`.
+
+Vergleicht die schlanken Einstiegspunkte mit dem eager geladenen Rechenpfad
+(`monatsanalyse.pipeline` + Export), den früher jeder Start mitgezogen hat,
+und prüft, dass pandas/numpy/openpyxl/xlsxwriter beim Start nicht geladen werden.
+
+Aufruf: python benchmarks/bench_importtime.py
+"""
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+HEAVY = ('pandas', 'numpy', 'openpyxl', 'xlsxwriter', 'pyarrow')
+
+TARGETS = {
+    'App (ma_streamlit_8)': 'import ma_streamlit_8',
+    'CLI (monatsanalyse.cli)': 'import monatsanalyse.cli',
+    'Rechenpfad eager': 'import streamlit, monatsanalyse.pipeline, monatsanalyse.export, xlsxwriter',
+}
+
+def import_profile(statement):
+    """Liefert (Gesamtzeit in ms, geladene Pakete) eines frischen Interpreters."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total, modules = 0, set()
+    for line in proc.stderr.splitlines():
+        m = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)', line)
+        if m:
+            modules.add(m.group(4).split('.')[0])
+            if not m.group(3):
+                total += int(m.group(2))
+    return total / 1000, modules
+
+def main(repeat=5):
+    for name, statement in TARGETS.items():
+        runs = [import_profile(statement) for _ in range(repeat)]
+        best = min(ms for ms, _ in runs)
+        heavy = sorted(set(HEAVY) & runs[0][1])
+        print(f"{name:<26} {best:8.1f} ms  schwer geladen: {', '.join(heavy) or '–'}")
+
+if __name__ == '__main__':
+    main()
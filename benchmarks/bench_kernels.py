@@ -0,0 +1,48 @@
+"""Durchmesser/Stärkeklasse/Vorschub auf Millionen Rohzeilen.
+
+Vergleicht die Spaltenausdrücke der KPI-Registry (je Kennzahl eine Series)
+mit dem fusionierten Kernel aus `monatsanalyse.kernels`.
+
+Aufruf: python benchmarks/bench_kernels.py [zeilen]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from monatsanalyse import kernels  # noqa: E402
+from monatsanalyse.kpi import compute_kpis  # noqa: E402
+
+def main(n=2_000_000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Stämme': rng.integers(50, 800, n),
+        'Durchschn_Stämme': rng.uniform(3.5, 5.5, n),
+        'Laufzeit_Minuten': rng.uniform(20, 400, n),
+    })
+    df['Volumen_Eingang'] = np.pi * df['Durchschn_Stämme'] * df['Stämme'] * (rng.uniform(80, 420, n) / 20000) ** 2
+
+    def series_path():
+        out = compute_kpis(df.copy(), ['Durchmesser', 'Stärke_Klasse', 'Vorschub(FM/h)'])
+        return out['Stärke_Klasse'].value_counts()
+
+    def kernel_path(use_numba):
+        return kernels.log_metrics(df['Volumen_Eingang'], df['Durchschn_Stämme'],
+                                   df['Stämme'], df['Laufzeit_Minuten'], use_numba=use_numba)
+
+    candidates = [('KPI-Series + value_counts', series_path),
+                  ('Kernel NumPy', lambda: kernel_path(False))]
+    if kernels.numba is not None:
+        kernel_path(True)  # Kompilierung nicht mitmessen
+        candidates.append(('Kernel numba', lambda: kernel_path(True)))
+    print(f"{n:,} Zeilen")
+    for name, fn in candidates:
+        best = min(timeit.repeat(fn, number=1, repeat=3))
+        print(f"{name:<28} {best * 1000:8.1f} ms")
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,50 @@
+"""Vergleicht Hash-Merge + Neusortierung mit dem sortierten Join auf einem Jahr Aufträge.
+
+Aufruf: python benchmarks/bench_merge.py
+"""
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.synthetic import make_year  # noqa: E402
+from monatsanalyse.pipeline import sorted_left_join  # noqa: E402
+
+def groupby_outputs(df_all):
+    df_all['Auftragsnummer'] = df_all['Auftrag'].astype(str).str.extract(r'^(\d{5})')
+    df_all['Auftrag_clean'] = df_all['Auftrag'].astype(str).str.extract(r'^(\d{5}\s*-\s*\S*\s*\d+x\d+)')[0]
+    agg_overall = (
+        df_all[df_all['Stämme'] != 0]
+        .groupby(['Auftragsnummer', 'Auftrag_clean'], as_index=False)
+        .agg({'Stämme': 'sum', 'Volumen_Eingang': 'sum', 'Laufzeit_Minuten': 'sum'})
+    )
+    grouped_dim = (
+        df_all[df_all['Stämme'] == 0]
+        .groupby(['Auftragsnummer', 'Dimension'], as_index=False)[['Teile', 'Brutto_Volumen']]
+        .sum()
+    )
+    return grouped_dim, agg_overall
+
+def hash_merge(grouped_dim, agg_overall):
+    merged = pd.merge(grouped_dim, agg_overall, on='Auftragsnummer', how='left')
+    merged.sort_values(['Auftragsnummer', 'Dimension'], inplace=True)
+    return merged
+
+def sorted_join(grouped_dim, agg_overall):
+    return sorted_left_join(grouped_dim, agg_overall, 'Auftragsnummer')[0]
+
+def main():
+    grouped_dim, agg_overall = groupby_outputs(make_year())
+    print(f"{len(grouped_dim)} Dimensionsgruppen, {len(agg_overall)} Aufträge")
+    a = hash_merge(grouped_dim, agg_overall).reset_index(drop=True)
+    b = sorted_join(grouped_dim, agg_overall)
+    pd.testing.assert_frame_equal(a, b)
+    for name, fn in [('pd.merge + sort_values', hash_merge), ('sorted_left_join', sorted_join)]:
+        best = min(timeit.repeat(lambda: fn(grouped_dim, agg_overall), number=20, repeat=5)) / 20
+        print(f"{name:<24} {best * 1000:8.3f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Misst die an den Browser gesendete Arrow-Payload der Detailtabelle.
+
+Vorher: `st.dataframe(final_df)` serialisiert das komplette Layout.
+Nachher: `filter_sort_page()` liefert nur die sichtbare Seite aus.
+
+Aufruf: python benchmarks/bench_table_payload.py
+"""
+import os
+import sys
+import timeit
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.synthetic import make_year  # noqa: E402
+from monatsanalyse.pipeline import build_final_df  # noqa: E402
+from monatsanalyse.table import filter_sort_page  # noqa: E402
+
+def payload_bytes(df):
+    """Größe des Arrow-IPC-Streams, wie ihn Streamlit für `st.dataframe` erzeugt."""
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+def main():
+    final_df = build_final_df(make_year(order_pool=20000))
+    page, total, _ = filter_sort_page(final_df, page_size=100)
+    sorted_page, _, _ = filter_sort_page(final_df, sort_by='Netto_Ausbeute', ascending=False)
+    print(f"{len(final_df)} Zeilen im Layout")
+    for name, df in [('komplette Tabelle', final_df), ('eine Seite (100)', page),
+                     ('sortierte Seite (100)', sorted_page)]:
+        serialize = min(timeit.repeat(lambda: payload_bytes(df), number=5, repeat=3)) / 5
+        print(f"{name:<22} {payload_bytes(df) / 1024:9.1f} KB  {serialize * 1000:7.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Synthetische Tages-Reports im Format der Ausbeuteanalyse-Exporte."""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+STAERKEN = [17, 22, 24, 32, 44]
+BREITEN = [100, 120, 150, 200]
+SORTEN_ANTEILE = {'CE': .30, 'SF': .20, 'SI': .10, 'IND': .10, 'NSI': .10, 'Q_V': .05, 'Ausschuss': .05}
+
+def make_day(rng, n_orders=40, n_dims=5, order_pool=600):
+    """Ein Tages-Report: je Auftrag eine Gesamtzeile plus `n_dims` Dimensionszeilen."""
+    nummern = 10000 + rng.choice(order_pool, size=n_orders, replace=False)
+    rows = []
+    for nr in nummern:
+        t, b = STAERKEN[nr % 5], BREITEN[nr % 4]
+        auftrag = f"{nr} - Fichte {t}x{b} Kunde"
+        # Volumen aus einem Zieldurchmesser, damit alle Stärkeklassen vorkommen
+        staemme, laenge = int(rng.integers(50, 800)), rng.uniform(3.5, 5.5)
+        durchmesser = rng.uniform(80, 420)
+        rows.append({
+            'Auftrag': auftrag, 'Dimension': np.nan,
+            'Stämme': staemme,
+            'Volumen_Eingang': np.pi * laenge * staemme * (durchmesser / 20000) ** 2,
+            'Durchschn_Stämme': laenge,
+            'Teile': int(rng.integers(100, 4000)),
+            'Durchmesser': durchmesser,
+            'Laufzeit_Minuten': rng.uniform(20, 400),
+            'Brutto_Volumen': 0.0, 'Netto_Volumen': 0.0,
+            **{s: 0.0 for s in SORTEN_ANTEILE},
+        })
+        for d in range(n_dims):
+            brutto = rng.uniform(1, 40)
+            rows.append({
+                'Auftrag': auftrag, 'Dimension': f"{t}x{b + d * 20}",
+                'Stämme': 0, 'Volumen_Eingang': 0.0, 'Durchschn_Stämme': 0.0,
+                'Teile': int(rng.integers(10, 1000)),
+                'Durchmesser': 0.0, 'Laufzeit_Minuten': 0.0,
+                'Brutto_Volumen': brutto, 'Netto_Volumen': brutto * .9,
+                **{s: brutto * a for s, a in SORTEN_ANTEILE.items()},
+            })
+    return pd.DataFrame(rows)
+
+def make_reports(n_days=250, seed=0, start=date(2024, 1, 2), **kwargs):
+    """Liefert `(dateiname, DataFrame)` für `n_days` aufeinanderfolgende Tage."""
+    rng = np.random.default_rng(seed)
+    return [
+        (f"Ausbeuteanalyse_{start + timedelta(days=i)}.xlsx", make_day(rng, **kwargs))
+        for i in range(n_days)
+    ]
+
+def make_year(seed=0, **kwargs):
+    """Ein Jahr Tages-Reports als ein zusammengefügtes `df_all`."""
+    return pd.concat([df for _, df in make_reports(seed=seed, **kwargs)], ignore_index=True)
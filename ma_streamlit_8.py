@@ -1,27 +1,71 @@
 import streamlit as st
-import pandas as pd
-import re
-import io
-import numpy as np
-from datetime import datetime
-
-def to_excel(df):
-    """Schreibt ein DataFrame in eine Excel-Datei im Memory."""
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False, sheet_name='Monatsanalyse')
-    return output.getvalue()
-
-def get_staerke_klasse(d):
-    """Ordnet einen Durchmesser einer Stärkeklasse zu."""
-    if d < 100:   return "0"
-    if d < 150:   return "1a"
-    if d < 200:   return "1b"
-    if d < 250:   return "2a"
-    if d < 300:   return "2b"
-    if d < 350:   return "3a"
-    if d < 400:   return "3b"
-    return "unbekannt"
+
+from monatsanalyse import cache
+from monatsanalyse.formatting import format_de, style_de
+
+ANOMALY_ROWS = 200
+
+def render_detail_table(final_df):
+    """Filter-/Sortierleiste und eine Seite der Detailtabelle."""
+    from monatsanalyse.table import PAGE_SIZES, filter_sort_page
+
+    f1, f2, f3 = st.columns(3)
+    auftrag = f1.text_input("Auftrag enthält", key='tbl_auftrag')
+    dimensionen = f2.multiselect(
+        "Dimension", sorted(d for d in final_df['Dimension'].unique() if d), key='tbl_dim'
+    )
+    klassen = f3.multiselect(
+        "Stärke_Klasse", sorted(k for k in final_df['Stärke_Klasse'].unique() if k), key='tbl_klasse'
+    )
+    s1, s2, s3, s4 = st.columns([2, 1, 1, 1])
+    sort_by = s1.selectbox("Sortieren nach", [None, *final_df.columns],
+                           format_func=lambda c: "Original-Layout" if c is None else c,
+                           key='tbl_sort')
+    descending = s2.toggle("absteigend", key='tbl_desc')
+    page_size = s3.selectbox("Zeilen pro Seite", PAGE_SIZES, index=1, key='tbl_size')
+    page = s4.number_input("Seite", min_value=1, step=1, key='tbl_page')
+
+    view, total, pages = filter_sort_page(
+        final_df, auftrag, dimensionen, klassen, sort_by, not descending, page, page_size
+    )
+    st.dataframe(style_de(view), use_container_width=True, hide_index=True)
+    if total:
+        first = (min(page, pages) - 1) * page_size
+        st.caption(f"Zeilen {first + 1}–{first + len(view)} von {total} · Seite {min(page, pages)}/{pages}")
+    else:
+        st.caption("Keine Zeilen für diese Filter.")
+
+@st.cache_resource
+def shared_results():
+    """Eine Ergebnis-Registry je Server-Prozess, geteilt von allen Sitzungen."""
+    from monatsanalyse.registry import ResultRegistry
+    return ResultRegistry()
+
+def compute_period(con, key, info, uploaded, files, rows):
+    """`(sheets, metrics)` eines Zeitraums aus dem SQLite-Cache oder frisch berechnet."""
+    cached = cache.cache_load(con, key)
+    if cached:
+        return cached
+
+    # — Teilsummen je Datei aus dem Arrow-Cache oder frisch eingelesen, im Rahmen des Budgets
+    from monatsanalyse.budget import ingest_partials, plan_ingest
+    from monatsanalyse.pipeline import reduce_partials
+    plan = plan_ingest(uploaded, rows=rows)
+    bar = st.progress(0.0, text=f"Lese {len(uploaded)} Datei(en) ein …")
+    partials = ingest_partials(
+        uploaded, [h for _, h in files], plan, rows=rows,
+        progress=lambda share: bar.progress(share, text=f"Lese ein … {share:.0%}")
+    )
+    bar.empty()
+    sheets = reduce_partials(partials)
+    final_df = sheets['Monatsanalyse']
+    metrics = {
+        **info,
+        'total_input_volume': float(final_df['Volumen_Eingang'].sum()),
+        'total_brutto': float(final_df['Brutto_Volumen'].sum()),
+    }
+    cache.cache_store(con, key, files, sheets, metrics)
+    return sheets, metrics
 
 def main():
     st.set_page_config(
@@ -53,170 +97,106 @@ def main():
         accept_multiple_files=True
     )
 
+    con = cache.open_cache()
+    periods = cache.cache_periods(con)
+    picked = st.sidebar.selectbox(
+        "…oder gespeicherten Zeitraum öffnen",
+        [None, *periods],
+        format_func=lambda k: "–" if k is None else periods[k],
+        disabled=bool(uploaded)
+    )
+
     st.title("📊 Monatsanalyse Ausbeute")
     st.markdown(
         "Diese App fasst die täglichen Ausbeute‑Reports pro Auftrag und Dimension "
         "über einen oder mehrere Monate zusammen und berechnet zusätzliche Kennzahlen."
     )
 
-    if not uploaded:
+    if uploaded:
+        # — Doppelte Uploads (gleicher Inhalt oder gleicher Report desselben Tages) gar nicht erst einlesen
+        reports, skipped = cache.dedupe_reports(uploaded)
+        if skipped:
+            st.sidebar.info(
+                f"{len(skipped)} doppelte Datei(en) übersprungen:\n"
+                + "\n".join(f"- `{name}`: {reason}" for name, reason in skipped)
+            )
+        # — Kopfzeilen prüfen und Zeilen zählen, bevor irgendetwas geparst wird (je Inhalt nur einmal)
+        from monatsanalyse.scan import scan_reports
+        valid, rejected = scan_reports([f for f, _, _ in reports], [h for _, _, h in reports])
+        if rejected:
+            st.error(
+                f"{len(rejected)} Datei(en) abgelehnt:\n"
+                + "\n".join(f"- `{name}`: {reason}" for name, reason in rejected)
+            )
+        if not valid:
+            return
+        accepted = {id(f) for f, _ in valid}
+        reports = [r for r in reports if id(r[0]) in accepted]
+        uploaded = [f for f, _, _ in reports]
+        rows = [scan['zeilen'] for _, scan in valid]
+        files = [(name, digest) for _, name, digest in reports]
+        cache.cache_invalidate(con, files)
+        info = cache.period_info([name for name, _ in files])
+        key = cache.cache_key(info, [h for _, h in files])
+        # — Ergebnis mit anderen Sitzungen teilen: wer später kommt, wartet auf die laufende Berechnung
+        from monatsanalyse.budget import BudgetExceeded, WorkerLost
+        registry = shared_results()
+        if registry.pending(key):
+            st.info("Dieser Zeitraum wird gerade in einer anderen Sitzung berechnet, das Ergebnis wird übernommen …")
+        try:
+            sheets, metrics = registry.get_or_compute(
+                key, lambda: compute_period(con, key, info, uploaded, files, rows)
+            )
+        except (BudgetExceeded, WorkerLost) as e:
+            st.error(str(e))
+            return
+    elif picked:
+        result = shared_results().get_or_compute(picked, lambda: cache.cache_load(con, picked))
+        if result is None:
+            # Inzwischen von `cache_invalidate` oder einer neueren Version verworfen
+            st.warning("Zeitraum nicht mehr vorhanden. Bitte die Dateien erneut hochladen.")
+            return
+        sheets, metrics = result
+    else:
         st.warning("Bitte mindestens eine Excel-Datei hochladen.")
         return
 
-    # — Einlesen aller Dateien
-    dfs = [pd.read_excel(f) for f in uploaded]
-    df_all = pd.concat(dfs, ignore_index=True)
-
-    # — Auftragsnummer & cleanen
-    df_all['Auftragsnummer'] = df_all['Auftrag'].astype(str).str.extract(r'^(\d{5})')
-    df_all['Auftrag_clean'] = df_all['Auftrag'].astype(str).str.extract(
-        r'^(\d{5}\s*-\s*(?:[A-Za-zÄÖÜäöü]*\s*)?\d+x\d+(?:x\d+)?)'
-    )[0]
-
-    # — Trennen Gesamt- vs. Dimensionszeilen
-    df_overall = df_all[df_all['Stämme'] != 0].copy()
-    df_dim     = df_all[df_all['Stämme'] == 0].copy()
-
-    # — Aggregation Gesamt
-    agg_overall = (
-        df_overall
-        .groupby(['Auftragsnummer','Auftrag_clean'], as_index=False)
-        .agg({
-            'Stämme':'sum',
-            'Volumen_Eingang':'sum',
-            'Durchschn_Stämme':'mean',
-            'Teile':'sum',
-            'Laufzeit_Minuten':'sum'
-        })
-        .rename(columns={'Teile':'Teile_gesamt','Auftrag_clean':'Auftrag'})
-    )
-    agg_overall['Durchmesser'] = np.sqrt(
-        agg_overall['Volumen_Eingang'] /
-        (np.pi * agg_overall['Durchschn_Stämme'] * agg_overall['Stämme'])
-    ) * 20000
-
-    # — Aggregation Dimensionen
-    dim_cols = ['Teile','Brutto_Volumen','Netto_Volumen','CE','SF','SI','IND','NSI','Q_V','Ausschuss']
-    grouped_dim = (
-        df_dim
-        .groupby(['Auftragsnummer','Dimension'], as_index=False)[dim_cols]
-        .sum()
-        .rename(columns={'Teile':'Teile_dim'})
-    )
-
-    # — Merge & Zusatzkennzahlen
-    merged = pd.merge(grouped_dim, agg_overall, on='Auftragsnummer', how='left')
-    merged['Brutto_Ausschuss'] = np.where(
-        merged['Brutto_Volumen']>0,
-        merged['Ausschuss']/merged['Brutto_Volumen']*100, 0
-    )
-    merged['Brutto_Ausbeute'] = np.where(
-        merged['Volumen_Eingang']>0,
-        merged['Brutto_Volumen']/merged['Volumen_Eingang']*100, 0
-    )
-    merged['Netto_Ausbeute'] = np.where(
-        merged['Volumen_Eingang']>0,
-        merged['Netto_Volumen']/merged['Volumen_Eingang']*100, 0
-    )
-
-    # — Original‑Layout rekonstruieren
-    final_cols = [
-        'Auftrag','Dimension',
-        'Stämme','Volumen_Eingang','Durchschn_Stämme','Teile_gesamt',
-        'Durchmesser','Stärke_Klasse','Laufzeit_Minuten','Vorschub(FM/h)',
-        'Brutto_Volumen','Brutto_Ausschuss','Netto_Volumen',
-        'Brutto_Ausbeute','Netto_Ausbeute',
-        'CE','SF','SI','IND','NSI','Q_V','Ausschuss'
-    ]
-    final_data = []
-    merged.sort_values(['Auftragsnummer','Dimension'], inplace=True)
-
-    for nr in merged['Auftragsnummer'].unique():
-        o = agg_overall.loc[agg_overall['Auftragsnummer']==nr].iloc[0]
-        row = {
-            'Auftrag': o['Auftrag'],
-            'Dimension': '',
-            'Stämme': o['Stämme'],
-            'Volumen_Eingang': o['Volumen_Eingang'],
-            'Durchschn_Stämme': o['Durchschn_Stämme'],
-            'Teile_gesamt': o['Teile_gesamt'],
-            'Durchmesser': o['Durchmesser'],
-            'Stärke_Klasse': get_staerke_klasse(o['Durchmesser']),
-            'Laufzeit_Minuten': o['Laufzeit_Minuten'],
-            'Vorschub(FM/h)': (o['Volumen_Eingang']/(o['Laufzeit_Minuten']/60)
-                               if o['Laufzeit_Minuten'] else 0)
-        }
-        for c in ['Brutto_Volumen','Brutto_Ausschuss','Netto_Volumen',
-                  'Brutto_Ausbeute','Netto_Ausbeute',
-                  'CE','SF','SI','IND','NSI','Q_V','Ausschuss']:
-            row[c] = 0
-        final_data.append(row)
-
-        for _, d in merged[merged['Auftragsnummer']==nr].iterrows():
-            row_d = {
-                'Auftrag': d['Auftrag'],
-                'Dimension': d['Dimension'],
-                'Stämme': 0,
-                'Volumen_Eingang': 0,
-                'Durchschn_Stämme': 0,
-                'Teile_gesamt': d['Teile_dim'],
-                'Durchmesser': 0,
-                'Stärke_Klasse': '',
-                'Laufzeit_Minuten': 0,
-                'Vorschub(FM/h)': 0,
-                'Brutto_Volumen': d['Brutto_Volumen'],
-                'Brutto_Ausschuss': d['Brutto_Ausschuss'],
-                'Netto_Volumen': d['Netto_Volumen'],
-                'Brutto_Ausbeute': d['Brutto_Ausbeute'],
-                'Netto_Ausbeute': d['Netto_Ausbeute'],
-                'CE': d['CE'], 'SF': d['SF'], 'SI': d['SI'],
-                'IND': d['IND'], 'NSI': d['NSI'], 'Q_V': d['Q_V'],
-                'Ausschuss': d['Ausschuss']
-            }
-            final_data.append(row_d)
-
-    final_df = pd.DataFrame(final_data, columns=final_cols)
-
-    # — Auf drei Nachkommastellen runden
-    final_df = final_df.round(3)
+    final_df = sheets['Monatsanalyse']
 
     # — Kennzahlen‑Dashboard oben
-    total_input_volume = final_df['Volumen_Eingang'].sum()
-    total_brutto = final_df['Brutto_Volumen'].sum()
-
-    # Datumsspanne und Anzahl Tage aus Dateinamen
-    dates = []
-    for f in uploaded:
-        m = re.search(r'(\d{4}-\d{2}-\d{2})', f.name)
-        if m:
-            dates.append(datetime.strptime(m.group(1), '%Y-%m-%d').date())
-    if dates:
-        start, end = min(dates), max(dates)
-        date_range_str = f"{start.strftime('%d.%m.%y')} - {end.strftime('%d.%m.%y')}"
-        filename_range = f"{start.strftime('%d_%m_%Y')}_{end.strftime('%d_%m_%Y')}"
-        num_days = len(set(dates))
-    else:
-        date_range_str = "–"
-        filename_range = "unknown"
-        num_days = 0
-
     c1, c2, c3, c4 = st.columns(4)
-    c1.metric("Gesamt Einschnittsvolumen", f"{total_input_volume:,.0f} m³")
-    c2.metric("Gesamt Brutto-Volumen", f"{total_brutto:,.0f} m³")
-    c3.metric("Daten von bis", date_range_str)
-    c4.metric("Anzahl Tage", f"{num_days}")
+    c1.metric("Gesamt Einschnittsvolumen", f"{format_de(metrics['total_input_volume'])} m³")
+    c2.metric("Gesamt Brutto-Volumen", f"{format_de(metrics['total_brutto'])} m³")
+    c3.metric("Daten von bis", metrics['date_range_str'])
+    c4.metric("Anzahl Tage", f"{metrics['num_days']}")
+
+    # — Auffälligkeiten: Tage mit |z| > 5 gegenüber den Vortagen desselben Auftrags/derselben Dimension
+    anomalies = sheets.get('Auffälligkeiten')
+    if anomalies is not None:
+        with st.expander(f"⚠️ Auffälligkeiten ({len(anomalies)})", expanded=len(anomalies) > 0):
+            if len(anomalies):
+                st.caption(
+                    "Netto_Ausbeute bzw. Brutto_Ausschuss weichen um mehr als fünf "
+                    "Standardabweichungen vom rollierenden Mittel der Vortage ab."
+                )
+                st.dataframe(
+                    style_de(anomalies.head(ANOMALY_ROWS)), use_container_width=True, hide_index=True
+                )
+            else:
+                st.caption("Keine auffälligen Tage gefunden.")
 
     # — Tabelle & Download
     with st.expander("▶️ Detailtabelle anzeigen"):
-        st.dataframe(final_df, use_container_width=True)
+        render_detail_table(final_df)
 
-    filename = f"monatsanalyse_{filename_range}.xlsx"
+    from monatsanalyse.export import to_excel
+    filename = f"monatsanalyse_{metrics['filename_range']}.xlsx"
     st.download_button(
         "📥 Als Excel herunterladen",
-        data=to_excel(final_df),
+        data=to_excel(sheets),
         file_name=filename,
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        help="Lädt die fertige Monatsauswertung als Excel-Datei."
+        help="Lädt die Monatsauswertung samt Summen je Stärkeklasse, Dimension und Tag als Excel-Datei."
     )
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+"""Monatsanalyse der täglichen Ausbeute-Reports.
+
+Das Paket importiert beim Laden nichts Schweres: pandas/numpy werden erst
+von den Untermodulen gezogen, die tatsächlich einlesen, rechnen oder exportieren.
+"""
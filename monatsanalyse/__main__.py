@@ -0,0 +1,3 @@
+from monatsanalyse.cli import main
+
+raise SystemExit(main())
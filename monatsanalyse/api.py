@@ -0,0 +1,148 @@
+"""HTTP-JSON-Schnittstelle für ERP- und BI-Werkzeuge.
+
+Liefert die gespeicherten Zeiträume aus dem Ergebnis-Cache; gerechnet wird
+hier nichts. Jede Antwort trägt ein ETag aus Cache-Schlüssel und
+Erstellzeit des Eintrags. Passt `If-None-Match`, kommt 304 ohne Body,
+sonst die einmal serialisierte Antwort aus dem Speicher. Wiederholtes
+Abfragen kostet damit eine indizierte SQLite-Abfrage statt einer
+Neuberechnung.
+
+    GET /zeitraeume                         gespeicherte Zeiträume mit Kennzahlen
+    GET /zeitraeume/<schluessel>            Kennzahlen, Summen je Stärkeklasse und Tag
+    GET /zeitraeume/<schluessel>/auftraege  Gesamtzeile je Auftrag
+    GET /zeitraeume/<schluessel>/dimensionen[?auftrag=12345]
+                                            Zeilen je Auftrag und Dimension
+"""
+import hashlib
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from monatsanalyse import cache
+from monatsanalyse.registry import ResultRegistry
+
+ORDER_COLS = [
+    'Auftrag', 'Stämme', 'Volumen_Eingang', 'Durchschn_Stämme', 'Teile_gesamt',
+    'Durchmesser', 'Stärke_Klasse', 'Laufzeit_Minuten', 'Vorschub(FM/h)',
+]
+DIMENSION_COLS = [
+    'Auftrag', 'Dimension', 'Teile_gesamt', 'Brutto_Volumen', 'Brutto_Ausschuss', 'Netto_Volumen',
+    'Brutto_Ausbeute', 'Netto_Ausbeute', 'CE', 'SF', 'SI', 'IND', 'NSI', 'Q_V', 'Ausschuss',
+]
+SUMMARY_SHEETS = {'staerkeklassen': 'Stärkeklassen', 'tage': 'Tage'}
+
+class NotFound(LookupError):
+    """Unbekannter Pfad oder Zeitraum."""
+
+def _records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso', force_ascii=False))
+
+def order_rows(final_df):
+    """Gesamtzeilen des Original-Layouts, ohne die leeren Dimensionsspalten."""
+    return final_df.loc[final_df['Dimension'] == '', ORDER_COLS]
+
+def dimension_rows(final_df, auftrag=None):
+    """Dimensionszeilen mit ihrem Auftrag, optional nur für genau eine Auftragsnummer."""
+    is_head = final_df['Dimension'] == ''
+    rows = final_df.assign(Auftrag=final_df['Auftrag'].where(is_head).ffill())[~is_head]
+    if auftrag:
+        # Fünfstellige Nummer am Anfang wie in der Pipeline; "1000" trifft nicht 10000–10009
+        rows = rows[rows['Auftrag'].str.extract(r'^(\d{5})', expand=False) == auftrag]
+    return rows[DIMENSION_COLS].rename(columns={'Teile_gesamt': 'Teile'})
+
+def _entry(con, key):
+    row = con.execute("SELECT erstellt FROM ergebnisse WHERE schluessel = ?", (key,)).fetchone()
+    if row is None:
+        raise NotFound(key)
+    return row[0]
+
+def _etag(*parts):
+    return '"' + hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()[:32] + '"'
+
+def resolve(con, path, query):
+    """ETag und eine Funktion, die den JSON-Body baut, für `path`; wirft `NotFound`."""
+    parts = [unquote(p) for p in path.strip('/').split('/')]
+    if parts == ['zeitraeume']:
+        rows = con.execute("SELECT schluessel, erstellt FROM ergebnisse ORDER BY start DESC, ende DESC").fetchall()
+
+        def body():
+            entries = con.execute(
+                "SELECT schluessel, erstellt, kennzahlen FROM ergebnisse ORDER BY start DESC, ende DESC"
+            ).fetchall()
+            return [{'schluessel': k, 'erstellt': e, 'kennzahlen': json.loads(m)} for k, e, m in entries]
+        return _etag(path, *(v for row in rows for v in row)), body
+    if len(parts) not in (2, 3) or parts[0] != 'zeitraeume':
+        raise NotFound(path)
+    key, view = parts[1], parts[2] if len(parts) == 3 else None
+    if view not in (None, 'auftraege', 'dimensionen'):
+        raise NotFound(path)
+    auftrag = query.get('auftrag', [''])[0]
+    created = _entry(con, key)
+
+    def body():
+        sheets, metrics = cache.cache_load(con, key)
+        final_df = sheets['Monatsanalyse']
+        result = {'schluessel': key, 'erstellt': created}
+        if view is None:
+            result['kennzahlen'] = metrics
+            result.update({name: _records(sheets[sheet])
+                           for name, sheet in SUMMARY_SHEETS.items() if sheet in sheets})
+        elif view == 'auftraege':
+            result['zeilen'] = _records(order_rows(final_df))
+        else:
+            result['zeilen'] = _records(dimension_rows(final_df, auftrag))
+        return result
+    return _etag(key, created, view, auftrag), body
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """GET-Anfragen gegen den Ergebnis-Cache des Servers."""
+
+    server_version = 'monatsanalyse'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            with self.server.lock:
+                etag, build = resolve(self.server.con, url.path, parse_qs(url.query))
+                if etag in self.headers.get('If-None-Match', ''):
+                    return self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+                body = self.server.bodies.get_or_compute(
+                    etag, lambda: json.dumps(build(), ensure_ascii=False).encode()
+                )
+        except NotFound:
+            return self._send(HTTPStatus.NOT_FOUND, b'{"fehler": "nicht gefunden"}')
+        self._send(HTTPStatus.OK, body, etag)
+
+    def _send(self, status, body=b'', etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(host='127.0.0.1', port=8502, cache_path=cache.CACHE_PATH):
+    """HTTP-Server über dem Ergebnis-Cache unter `cache_path` (noch nicht gestartet)."""
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    server.con = cache.open_cache(cache_path, check_same_thread=False)
+    server.lock = threading.Lock()
+    server.bodies = ResultRegistry(max_entries=64)
+    return server
+
+def serve(host='127.0.0.1', port=8502, cache_path=cache.CACHE_PATH):
+    """Startet den Server und bedient Anfragen bis Strg+C."""
+    with make_server(host, port, cache_path) as server:
+        print(f"Monatsanalyse-API auf http://{host}:{server.server_address[1]}/zeitraeume")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
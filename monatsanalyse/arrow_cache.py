@@ -0,0 +1,132 @@
+"""Arrow-IPC-Cache für eingelesene Tages-Reports und ihre Teilsummen.
+
+Jede Datei wird über den Hash ihres Inhalts plus das Berichtsdatum aus dem
+Dateinamen abgelegt (`Datum` stammt aus dem Namen, derselbe Inhalt unter
+anderem Datum ist also ein anderer Eintrag): der geparste Report und die
+Teilsummen aus `partial_aggregate`, beides unkomprimiert im Feather-Format
+(Arrow IPC). Geladen wird per Memory-Map: die Spalten zeigen
+direkt in den Page-Cache, ein neu gestarteter Server hat für bekannte
+Dateien praktisch keine Deserialisierungskosten, und mehrere Worker-Prozesse
+teilen sich denselben Speicher.
+
+Das Verzeichnis ist auf `MONATSANALYSE_ARROW_CACHE_MB` begrenzt (Standard
+2048); darüber fliegen die am längsten nicht benutzten Einträge.
+"""
+import os
+import tempfile
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from monatsanalyse.cache import file_hash, file_name, report_date
+from monatsanalyse.pipeline import PARTIAL_KEYS, partial_aggregate, read_reports
+
+ARROW_CACHE_DIR = os.environ.get(
+    'MONATSANALYSE_ARROW_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'monatsanalyse', 'arrow')
+)
+
+ARROW_CACHE_MB = float(os.environ.get('MONATSANALYSE_ARROW_CACHE_MB') or 2048)
+
+# Bei jeder Änderung an `partial_aggregate` erhöhen, damit alte Teilsummen neu entstehen
+PARTIAL_VERSION = 3
+
+def entry_key(f, digest=None):
+    """Cache-Schlüssel einer Datei: Inhalts-Hash und Berichtsdatum aus dem Namen."""
+    day = report_date(file_name(f))
+    return f"{digest or file_hash(f)}_{day.isoformat() if day else 'ohne-datum'}"
+
+def _path(key, kind, cache_dir):
+    return os.path.join(cache_dir, f'{key}.{kind}.arrow')
+
+def store_frame(df, key, kind, cache_dir=ARROW_CACHE_DIR):
+    """Schreibt `df` atomar als unkomprimierte Feather-Datei; False, wenn Arrow es nicht abbilden kann."""
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        feather.write_feather(df, tmp, compression='uncompressed')
+        os.replace(tmp, _path(key, kind, cache_dir))
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return False
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return True
+
+def load_frame(key, kind, cache_dir=ARROW_CACHE_DIR):
+    """Lädt einen Eintrag per Memory-Map (Spalten ohne Kopie) oder None."""
+    path = _path(key, kind, cache_dir)
+    try:
+        # Zugriffszeit für die Verdrängung in `prune_cache`
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True, self_destruct=False)
+
+def prune_cache(cache_dir=ARROW_CACHE_DIR, max_mb=ARROW_CACHE_MB):
+    """Löscht die am längsten nicht benutzten Einträge, bis das Verzeichnis unter `max_mb` liegt.
+
+    Report und Teilsummen einer Datei gehen gemeinsam. Liefert die Zahl der
+    gelöschten Dateien.
+    """
+    entries = {}
+    try:
+        listing = list(os.scandir(cache_dir))
+    except FileNotFoundError:
+        return 0
+    for item in listing:
+        if not item.name.endswith('.arrow'):
+            continue
+        try:
+            stat = item.stat()
+        except FileNotFoundError:
+            continue
+        key = item.name.split('.', 1)[0]
+        used, size, paths = entries.get(key, (0, 0, []))
+        entries[key] = (max(used, stat.st_mtime), size + stat.st_size, [*paths, item.path])
+    total, removed = sum(size for _, size, _ in entries.values()), 0
+    for used, size, paths in sorted(entries.values(), key=lambda e: e[0]):
+        if total <= max_mb * 2**20:
+            break
+        for path in paths:
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        total -= size
+    return removed
+
+def partial_cached(f, digest=None, cache_dir=ARROW_CACHE_DIR):
+    """True, wenn die Teilsummen einer Datei im Cache liegen (ohne sie zu laden)."""
+    key = entry_key(f, digest)
+    return all(os.path.exists(_path(key, f'partial{PARTIAL_VERSION}-{kind}', cache_dir))
+               for kind in ('overall', 'dim'))
+
+def cached_report(f, digest=None, cache_dir=ARROW_CACHE_DIR):
+    """Der geparste Tages-Report einer Datei, aus dem Cache oder frisch eingelesen."""
+    key = entry_key(f, digest)
+    df = load_frame(key, 'report', cache_dir)
+    if df is None:
+        df = read_reports([f])
+        store_frame(df, key, 'report', cache_dir)
+    return df
+
+def cached_partial(f, digest=None, cache_dir=ARROW_CACHE_DIR):
+    """Die Teilsummen einer Datei; bei einem Treffer wird die Datei gar nicht angefasst."""
+    key = entry_key(f, digest)
+    partial = {}
+    for kind in PARTIAL_KEYS:
+        df = load_frame(key, f'partial{PARTIAL_VERSION}-{kind}', cache_dir)
+        if df is not None:
+            partial[kind] = df
+    if 'overall' in partial and 'dim' in partial:
+        return partial
+    partial = partial_aggregate(cached_report(f, digest, cache_dir))
+    for kind, df in partial.items():
+        store_frame(df, key, f'partial{PARTIAL_VERSION}-{kind}', cache_dir)
+    prune_cache(cache_dir)
+    return partial
@@ -0,0 +1,59 @@
+"""Batch-Modus für große Auswertungen (z. B. Jahresberichte über mehrere Standorte).
+
+Map: jede Datei wird für sich eingelesen und zu Teilsummen verdichtet, die
+als kompaktes Parquet in ein eigenes Verzeichnis geschrieben werden.
+Reduce: beliebig viele solcher Verzeichnisse werden eingelesen, addiert und
+zu Kennzahlen und Layout verarbeitet. Map-Aufgaben können auf verschiedenen
+Prozessen oder Rechnern laufen, solange der Reduce-Schritt ihre Ausgaben sieht.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import pandas as pd
+
+from monatsanalyse.pipeline import partial_aggregate, read_reports, reduce_partials
+
+META_FILE = 'quelle.json'
+
+def write_partial(partial, out_dir, source):
+    """Schreibt die Teilsummen einer Quelle als `<teil>.parquet` nach `out_dir`."""
+    os.makedirs(out_dir, exist_ok=True)
+    for kind, df in partial.items():
+        df.to_parquet(os.path.join(out_dir, f'{kind}.parquet'), index=False, compression='zstd')
+    with open(os.path.join(out_dir, META_FILE), 'w', encoding='utf-8') as fh:
+        json.dump({'name': source, 'teile': list(partial)}, fh)
+
+def read_partial(out_dir):
+    """Liest ein mit `write_partial` geschriebenes Verzeichnis; liefert `(teilsummen, quelle)`."""
+    with open(os.path.join(out_dir, META_FILE), encoding='utf-8') as fh:
+        meta = json.load(fh)
+    partial = {
+        kind: pd.read_parquet(os.path.join(out_dir, f'{kind}.parquet'))
+        for kind in meta['teile']
+    }
+    return partial, meta['name']
+
+def map_file(path, out_root):
+    """Map-Aufgabe: eine Datei einlesen, verdichten und als Parquet ablegen."""
+    name = os.path.basename(path)
+    digest = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:8]
+    out_dir = os.path.join(out_root, f'{os.path.splitext(name)[0]}-{digest}')
+    write_partial(partial_aggregate(read_reports([path])), out_dir, name)
+    return out_dir
+
+def reduce_dirs(dirs, summaries=True):
+    """Reduce-Aufgabe: liefert `(blaetter, quelldateinamen)` aus Map-Verzeichnissen."""
+    partials, names = zip(*map(read_partial, dirs)) if dirs else ((), ())
+    return reduce_partials(list(partials), summaries), list(names)
+
+def run_local(files, workers=None, out_root=None):
+    """Map über einen lokalen Prozess-Pool, danach Reduce im aufrufenden Prozess."""
+    with tempfile.TemporaryDirectory(prefix='monatsanalyse-') as tmp:
+        out_root = out_root or tmp
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            dirs = list(pool.map(map_file, files, repeat(out_root)))
+        return reduce_dirs(dirs)[0]
@@ -0,0 +1,296 @@
+"""Speicher- und Prozessbudget für das Einlesen auf geteilten Rechnern.
+
+Vor dem Einlesen wird die Größe von `df_all` aus den Dateigrößen geschätzt;
+die Umrechnung (Zeilen je Datei-Byte, Speicher je Zeile) lernt der Schätzer
+aus den bisher eingelesenen Dateien. Passt alles ins Budget, wird wie
+gewohnt in einem Stück gelesen, sonst Datei für Datei zu Teilsummen
+verdichtet, sodass immer nur ein Report im Speicher liegt. Eine Datei,
+die allein nicht hineinpasst, wird mit einer Meldung abgelehnt.
+
+Das Budget gilt für den ganzen Prozess, nicht je Aufruf: jede Datei
+reserviert vor dem Parsen ihre geschätzte Spitze in `RESERVATION` und gibt
+sie danach frei, parallele Sitzungen warten also aufeinander. Geparst wird
+in einem einzigen, prozessweiten Pool mit höchstens `WORKERS` Prozessen,
+gestartet per `forkserver`, statt bei jedem Aufruf aus dem mehrfädigen
+Streamlit-Server heraus zu forken.
+
+Konfiguration über `MONATSANALYSE_MEMORY_MB` (0 oder leer = unbegrenzt)
+und `MONATSANALYSE_WORKERS`.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from monatsanalyse.cache import file_name
+
+MEMORY_MB = float(os.environ.get('MONATSANALYSE_MEMORY_MB') or 0) or None
+WORKERS = int(os.environ.get('MONATSANALYSE_WORKERS') or 0) or os.cpu_count() or 1
+
+# Startwerte, gemessen an typischen Ausbeuteanalyse-Exporten
+ROWS_PER_BYTE = 1 / 120
+BYTES_PER_ROW = 200
+# Spitze beim Parsen (openpyxl-Zellen, Zwischenlisten) relativ zum fertigen Frame
+PARSE_FACTOR = 6
+# Darunter (rund eine Sekunde Parsen) lohnt kein Prozess-Pool
+PARALLEL_MIN_ROWS = 5_000
+
+class BudgetExceeded(ValueError):
+    """Eine einzelne Datei passt nicht ins Speicherbudget."""
+
+class WorkerLost(RuntimeError):
+    """Ein Parse-Prozess ist während des Einlesens gestorben (z. B. vom OOM-Killer beendet)."""
+
+class SizeEstimator:
+    """Schätzt den Speicherbedarf eingelesener Reports aus ihrer Dateigröße.
+
+    Jede eingelesene Datei verfeinert die Umrechnung; es zählt die Summe
+    über alle bisher gesehenen Dateien, nicht nur die letzte.
+    """
+
+    def __init__(self, rows_per_byte=ROWS_PER_BYTE, bytes_per_row=BYTES_PER_ROW):
+        self.file_bytes, self.rows, self.frame_bytes = 0, 0, 0
+        self.prior = (rows_per_byte, bytes_per_row)
+
+    def observe(self, file_bytes, rows, frame_bytes):
+        self.file_bytes += file_bytes
+        self.rows += rows
+        self.frame_bytes += frame_bytes
+
+    def rows_for(self, file_bytes):
+        rows_per_byte = self.rows / self.file_bytes if self.file_bytes else self.prior[0]
+        return file_bytes * rows_per_byte
+
+    def bytes_for_rows(self, rows):
+        bytes_per_row = self.frame_bytes / self.rows if self.rows else self.prior[1]
+        return rows * bytes_per_row
+
+    def estimate(self, file_bytes, rows=None):
+        """Geschätzter Speicher des geparsten Reports; `rows`, falls schon bekannt."""
+        return self.bytes_for_rows(self.rows_for(file_bytes) if rows is None else rows)
+
+# Prozessweit, damit jede Sitzung von den bereits gelesenen Dateien profitiert
+ESTIMATOR = SizeEstimator()
+
+class MemoryReservation:
+    """Summe der Bytes, die gerade laufende Parse-Vorgänge im Prozess belegen dürfen.
+
+    `acquire(n)` blockiert, bis `n` weitere Bytes ins Budget passen; mehr
+    als das ganze Budget wird auf das Budget begrenzt, damit eine einzelne
+    große Datei (von `plan_ingest` bereits geprüft) immer drankommt. Ohne
+    Budget wird nur gezählt.
+    """
+
+    def __init__(self, budget_bytes=None):
+        self.budget = budget_bytes
+        self.in_flight = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, n):
+        """Reserviert `n` Bytes und liefert die tatsächlich reservierte Menge (für `release`)."""
+        n = int(n if self.budget is None else min(n, self.budget))
+        with self._cond:
+            if self.budget is not None:
+                self._cond.wait_for(lambda: self.in_flight + n <= self.budget)
+            self.in_flight += n
+        return n
+
+    def release(self, n):
+        with self._cond:
+            self.in_flight -= n
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserved(self, n):
+        n = self.acquire(n)
+        try:
+            yield
+        finally:
+            self.release(n)
+
+RESERVATION = MemoryReservation(MEMORY_MB * 2**20 if MEMORY_MB else None)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def shared_executor():
+    """Der prozessweite Pool für Parse-Vorgänge, beim ersten Bedarf mit `WORKERS` Prozessen gestartet.
+
+    Ist ein Worker gestorben, nimmt der Pool keine Aufträge mehr an; er
+    wird dann verworfen und neu gestartet.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor._broken:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+        if _executor is None:
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executor = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context(method))
+        return _executor
+
+def _size(f):
+    if isinstance(f, (str, os.PathLike)):
+        return os.path.getsize(f)
+    return f.getbuffer().nbytes
+
+def _mb(n):
+    return f"{n / 2**20:,.1f} MB"
+
+def plan_ingest(files, memory_mb=MEMORY_MB, workers=WORKERS, estimator=ESTIMATOR, rows=None):
+    """Entscheidet, wie `files` eingelesen werden.
+
+    Liefert `{'modus': 'gesamt' | 'stream', 'parallel': n, 'geschaetzt': bytes,
+    'spitzen': [bytes je Datei]}`, wobei `spitzen` der beim Parsen zu
+    reservierende Speicher ist;
+    `rows` (Zeilen je Datei, z. B. aus `scan_reports`), falls vorab bekannt,
+    ersetzt die Schätzung aus der Dateigröße. Unter `PARALLEL_MIN_ROWS`
+    Zeilen insgesamt wird seriell gelesen. Löst `BudgetExceeded` aus, wenn
+    schon eine Datei allein das Budget sprengt.
+    """
+    sizes = list(map(_size, files))
+    rows = [estimator.rows_for(b) if r is None else r for b, r in zip(sizes, rows or [None] * len(files))]
+    frames = [estimator.estimate(b, r) for b, r in zip(sizes, rows)]
+    total, peak = sum(frames), max(frames, default=0) * PARSE_FACTOR
+    peaks = [frame * PARSE_FACTOR for frame in frames]
+    if sum(rows) < PARALLEL_MIN_ROWS:
+        workers = 1
+    if memory_mb is None:
+        return {'modus': 'gesamt', 'parallel': max(1, min(workers, len(files))), 'geschaetzt': total,
+                'spitzen': peaks}
+    budget = memory_mb * 2**20
+    if peak > budget:
+        name = file_name(files[frames.index(max(frames))])
+        raise BudgetExceeded(
+            f"{name} braucht beim Einlesen geschätzt {_mb(peak)}, "
+            f"das Speicherbudget beträgt {_mb(budget)}. Bitte die Datei aufteilen "
+            f"oder MONATSANALYSE_MEMORY_MB erhöhen."
+        )
+    return {
+        'modus': 'gesamt' if total + peak <= budget else 'stream',
+        'parallel': max(1, min(workers, int(budget // peak) if peak else workers, len(files))),
+        'geschaetzt': total,
+        'spitzen': peaks,
+    }
+
+def _portable(f):
+    """Uploads als einfache BytesIO mit Namen, damit sie sich an Worker-Prozesse schicken lassen."""
+    if isinstance(f, (str, os.PathLike)):
+        return f
+    buf = io.BytesIO(f.getvalue())
+    buf.name = f.name
+    return buf
+
+def _parse_partial(f, digest, cache_dir=None):
+    """Teilsummen einer Datei plus `(zeilen, bytes)` des Reports, falls er geparst werden musste."""
+    from monatsanalyse.arrow_cache import ARROW_CACHE_DIR, cached_partial, cached_report, partial_cached
+
+    cache_dir = cache_dir or ARROW_CACHE_DIR
+    seen = None
+    if not partial_cached(f, digest, cache_dir):
+        report = cached_report(f, digest, cache_dir)
+        seen = (len(report), int(report.memory_usage(deep=True).sum()))
+        del report
+    return cached_partial(f, digest, cache_dir), seen
+
+def ingest_partials(files, digests, plan, estimator=ESTIMATOR, cache_dir=None, rows=None, progress=None,
+                    reservation=RESERVATION):
+    """Teilsummen je Datei, mit höchstens `plan['parallel']` gleichzeitigen Parse-Vorgängen.
+
+    Vor jedem Parse-Vorgang wird die geschätzte Spitze der Datei
+    (`plan['spitzen']`) in `reservation` reserviert; laufen andere
+    Sitzungen, wird gewartet, bis wieder genug frei ist. `progress(anteil)`
+    wird nach jeder Datei aufgerufen, gewichtet mit `rows` (Zeilen je
+    Datei), falls bekannt. Stirbt ein Worker, löst das `WorkerLost` aus;
+    der nächste Aufruf bekommt einen frischen Pool.
+    """
+    files = list(files)
+    peaks = plan.get('spitzen') or [0] * len(files)
+    weights = [max(r, 1) if r is not None else 1 for r in (rows or [None] * len(files))]
+    partials, done = [None] * len(files), 0
+
+    def finished(i, partial, seen):
+        nonlocal done
+        if seen:
+            estimator.observe(_size(files[i]), *seen)
+        partials[i] = partial
+        done += weights[i]
+        if progress:
+            progress(done / sum(weights))
+
+    if plan['parallel'] <= 1:
+        for i, (f, digest) in enumerate(zip(files, digests)):
+            with reservation.reserved(peaks[i]):
+                finished(i, *_parse_partial(f, digest, cache_dir))
+        return partials
+
+    pool, running = shared_executor(), {}
+
+    def collect():
+        completed, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in completed:
+            i = running.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                raise WorkerLost(
+                    f"Der Einlese-Prozess für {file_name(files[i])} wurde unerwartet beendet "
+                    f"(vermutlich zu wenig Speicher). Bitte erneut versuchen; tritt das wieder auf, "
+                    f"MONATSANALYSE_MEMORY_MB oder MONATSANALYSE_WORKERS senken."
+                ) from None
+            finished(i, *result)
+
+    def submit(f, digest):
+        nonlocal pool
+        try:
+            return pool.submit(_parse_partial, _portable(f), digest, cache_dir)
+        except BrokenProcessPool:
+            # Zwischen `shared_executor()` und hier gestorben: einmal mit frischem Pool
+            pool = shared_executor()
+            return pool.submit(_parse_partial, _portable(f), digest, cache_dir)
+
+    try:
+        for i, (f, digest) in enumerate(zip(files, digests)):
+            while len(running) >= plan['parallel']:
+                collect()
+            n = reservation.acquire(peaks[i])
+            try:
+                future = submit(f, digest)
+            except BaseException:
+                reservation.release(n)
+                raise
+            # Freigabe, sobald der Worker fertig ist, auch wenn niemand mehr abholt
+            future.add_done_callback(lambda _, n=n: reservation.release(n))
+            running[future] = i
+        while running:
+            collect()
+    finally:
+        for future in running:
+            future.cancel()
+    return partials
+
+def build_report_within_budget(files, memory_mb=MEMORY_MB, workers=WORKERS, estimator=ESTIMATOR,
+                               rows=None):
+    """Monatsanalyse aus Pfaden oder Uploads, im Rahmen des Budgets.
+
+    Im Modus `gesamt` wie `build_report(read_reports(files))`, im Modus
+    `stream` über Teilsummen je Datei (ohne Arrow-Cache), sodass `df_all`
+    nie vollständig im Speicher liegt.
+    """
+    from monatsanalyse.pipeline import build_report, partial_aggregate, read_reports, reduce_partials
+
+    plan = plan_ingest(files, memory_mb, workers, estimator, rows)
+    if plan['modus'] == 'gesamt':
+        df_all = read_reports(files)
+        estimator.observe(sum(map(_size, files)), len(df_all), int(df_all.memory_usage(deep=True).sum()))
+        return build_report(df_all)
+    partials = []
+    for f in files:
+        df = read_reports([f])
+        estimator.observe(_size(f), len(df), int(df.memory_usage(deep=True).sum()))
+        partials.append(partial_aggregate(df))
+        del df
+    return reduce_partials(partials)
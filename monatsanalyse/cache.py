@@ -0,0 +1,211 @@
+"""Ergebnis-Cache und Zeitraum-Metadaten.
+
+Nur Standardbibliothek auf Modulebene, damit die App gespeicherte Zeiträume
+auflisten kann, ohne pandas zu laden.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+# — Ergebnis-Cache: fertige Zeiträume in einer lokalen SQLite-Datenbank —
+CACHE_PATH = os.environ.get(
+    'MONATSANALYSE_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'monatsanalyse', 'ergebnisse.sqlite')
+)
+# Bei jeder Änderung an Berechnung oder Layout der Ergebnisse erhöhen; ältere Einträge
+# werden beim Öffnen verworfen statt ausgeliefert
+RESULT_VERSION = 4
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ergebnisse (
+    schluessel TEXT PRIMARY KEY,
+    start      TEXT,
+    ende       TEXT,
+    erstellt   TEXT,
+    kennzahlen TEXT,
+    final_df   BLOB
+);
+CREATE TABLE IF NOT EXISTS dateien (
+    schluessel TEXT REFERENCES ergebnisse(schluessel) ON DELETE CASCADE,
+    name       TEXT,
+    hash       TEXT
+);
+CREATE INDEX IF NOT EXISTS dateien_name ON dateien(name);
+CREATE TABLE IF NOT EXISTS blaetter (
+    schluessel TEXT REFERENCES ergebnisse(schluessel) ON DELETE CASCADE,
+    pos        INTEGER,
+    name       TEXT,
+    daten      BLOB
+);
+"""
+
+def _to_parquet(df):
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    return buf.getvalue()
+
+def file_hash(f):
+    """SHA-256 über den Inhalt einer hochgeladenen Datei oder eines Pfads."""
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, 'rb') as fh:
+            return hashlib.sha256(fh.read()).hexdigest()
+    return hashlib.sha256(f.getvalue()).hexdigest()
+
+DATE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+def report_date(name):
+    """Berichtsdatum aus einem Dateinamen (`..._YYYY-MM-DD`) oder None."""
+    m = DATE_RE.search(name)
+    return datetime.strptime(m.group(1), '%Y-%m-%d').date() if m else None
+
+def report_slot(name):
+    """`(rest_des_namens, datum)`: derselbe Report einer Quelle (z. B. eines Standorts) an einem Tag.
+
+    None, wenn der Name kein Datum enthält.
+    """
+    day = report_date(name)
+    return None if day is None else (DATE_RE.sub('', name, count=1), day)
+
+def file_name(f):
+    """Dateiname eines Pfads oder Uploads."""
+    return os.path.basename(f if isinstance(f, (str, os.PathLike)) else f.name)
+
+def dedupe_reports(files):
+    """Sortiert doppelte Tages-Reports aus, bevor sie eingelesen werden.
+
+    Duplikat ist ein Report mit gleichem Inhalt (Hash) oder gleichem
+    Berichtsdatum bei sonst gleichem Dateinamen; Reports verschiedener
+    Standorte (`SiteA_…`, `SiteB_…`) vom selben Tag bleiben erhalten.
+    Behalten wird jeweils die neueste Fassung: bei Pfaden nach
+    Änderungszeit, bei Uploads die zuletzt hochgeladene.
+    Liefert `(behalten, uebersprungen)`: `[(datei, name, hash)]` in
+    Eingabereihenfolge und `[(name, grund)]`.
+    """
+    entries = [(pos, f, file_name(f), file_hash(f)) for pos, f in enumerate(files)]
+
+    def age(entry):
+        pos, f = entry[:2]
+        mtime = os.path.getmtime(f) if isinstance(f, (str, os.PathLike)) else 0
+        return mtime, pos
+
+    kept, skipped, by_hash, by_slot = [], [], {}, {}
+    for entry in sorted(entries, key=age, reverse=True):
+        name, digest = entry[2:]
+        slot = report_slot(name)
+        if digest in by_hash:
+            same = by_hash[digest]
+            reason = "identische Datei doppelt" if same == name else f"gleicher Inhalt wie {same}"
+            skipped.append((entry[0], name, reason))
+        elif slot is not None and slot in by_slot:
+            skipped.append((entry[0], name, f"gleicher Report wie {by_slot[slot]}, ältere Fassung"))
+        else:
+            kept.append(entry)
+            by_hash[digest] = name
+            if slot is not None:
+                by_slot[slot] = name
+    kept.sort(key=lambda e: e[0])
+    skipped.sort(key=lambda s: s[0])
+    return [e[1:] for e in kept], [s[1:] for s in skipped]
+
+def period_info(names):
+    """Datumsspanne und Anzahl Tage aus den Dateinamen (`..._YYYY-MM-DD`)."""
+    dates = [d for d in map(report_date, names) if d is not None]
+    if not dates:
+        return {'start': None, 'end': None, 'date_range_str': "–",
+                'filename_range': "unknown", 'num_days': 0}
+    start, end = min(dates), max(dates)
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'date_range_str': f"{start.strftime('%d.%m.%y')} - {end.strftime('%d.%m.%y')}",
+        'filename_range': f"{start.strftime('%d_%m_%Y')}_{end.strftime('%d_%m_%Y')}",
+        'num_days': len(set(dates)),
+    }
+
+def cache_key(info, hashes):
+    """Schlüssel aus Ergebnisversion, Datumsspanne und der Menge der Datei-Hashes."""
+    digest = hashlib.sha256("\n".join(sorted(hashes)).encode()).hexdigest()[:16]
+    return f"v{RESULT_VERSION}_{info['start']}_{info['end']}_{digest}"
+
+def open_cache(path=CACHE_PATH, **connect_kwargs):
+    """Öffnet (und legt bei Bedarf an) die Cache-Datenbank; Optionen gehen an `sqlite3.connect`.
+
+    Ergebnisse einer älteren `RESULT_VERSION` werden dabei gelöscht.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    con = sqlite3.connect(path, **connect_kwargs)
+    con.execute("PRAGMA foreign_keys = ON")
+    con.executescript(CACHE_SCHEMA)
+    prefix = f"v{RESULT_VERSION}_"
+    with con:
+        con.execute("DELETE FROM ergebnisse WHERE substr(schluessel, 1, ?) != ?", (len(prefix), prefix))
+    return con
+
+def cache_invalidate(con, files):
+    """Entfernt Einträge, deren Eingabedatei gleichen Namens sich geändert hat."""
+    with con:
+        for name, digest in files:
+            con.execute(
+                "DELETE FROM ergebnisse WHERE schluessel IN "
+                "(SELECT schluessel FROM dateien WHERE name = ? AND hash != ?)",
+                (name, digest)
+            )
+
+def cache_load(con, key):
+    """Liefert `(blaetter, kennzahlen)` für einen Schlüssel oder None.
+
+    `blaetter` ist `{blattname: DataFrame}` mit `Monatsanalyse` an erster Stelle.
+    """
+    row = con.execute(
+        "SELECT kennzahlen, final_df FROM ergebnisse WHERE schluessel = ?", (key,)
+    ).fetchone()
+    if row is None:
+        return None
+    import pandas as pd
+    sheets = {'Monatsanalyse': pd.read_parquet(io.BytesIO(row[1]))}
+    for name, data in con.execute(
+        "SELECT name, daten FROM blaetter WHERE schluessel = ? ORDER BY pos", (key,)
+    ):
+        sheets[name] = pd.read_parquet(io.BytesIO(data))
+    return sheets, json.loads(row[0])
+
+def cache_store(con, key, files, sheets, metrics):
+    """Speichert ein Ergebnis unter `key`; ein Eintrag mit gleichem Schlüssel wird ersetzt.
+
+    Andere Ergebnisse derselben Datumsspanne (z. B. anderer Standort)
+    bleiben stehen, veraltete entfernt `cache_invalidate`.
+    """
+    main, *summaries = sheets.items()
+    with con:
+        # Über das Löschen (statt REPLACE) gehen auch Dateien und Blätter des alten Eintrags mit
+        con.execute("DELETE FROM ergebnisse WHERE schluessel = ?", (key,))
+        con.execute(
+            "INSERT INTO ergebnisse VALUES (?, ?, ?, ?, ?, ?)",
+            (key, metrics['start'], metrics['end'], datetime.now().isoformat(timespec='seconds'),
+             json.dumps(metrics), _to_parquet(main[1]))
+        )
+        con.executemany(
+            "INSERT INTO dateien VALUES (?, ?, ?)",
+            [(key, name, digest) for name, digest in files]
+        )
+        con.executemany(
+            "INSERT INTO blaetter VALUES (?, ?, ?, ?)",
+            [(key, pos, name, _to_parquet(df)) for pos, (name, df) in enumerate(summaries)]
+        )
+
+def cache_periods(con):
+    """Alle gespeicherten Zeiträume, neueste zuerst, als `{schluessel: anzeige}`.
+
+    Mehrere Ergebnisse derselben Spanne werden mit ihrer Erstellzeit unterschieden.
+    """
+    rows = con.execute(
+        "SELECT schluessel, erstellt, kennzahlen FROM ergebnisse ORDER BY start DESC, ende DESC, erstellt DESC"
+    ).fetchall()
+    labels = [json.loads(metrics)['date_range_str'] for _, _, metrics in rows]
+    return {
+        key: label if labels.count(label) == 1 else f"{label} (erstellt {created.replace('T', ' ')})"
+        for (key, created, _), label in zip(rows, labels)
+    }
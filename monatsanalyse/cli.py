@@ -0,0 +1,125 @@
+"""Kommandozeile: `python -m monatsanalyse {run,map,reduce,batch,serve} ...`.
+
+Die Unterbefehle importieren pandas & Co. erst beim Ausführen, damit
+`--help` und Tippfehler sofort antworten.
+"""
+import argparse
+import os
+import sys
+
+def _write_report(sheets, names, output):
+    from monatsanalyse.cache import period_info
+    from monatsanalyse.export import to_excel
+
+    info = period_info(names)
+    output = output or f"monatsanalyse_{info['filename_range']}.xlsx"
+    with open(output, 'wb') as fh:
+        fh.write(to_excel(sheets))
+    print(f"{len(sheets['Monatsanalyse'])} Zeilen ({info['date_range_str']}) -> {output}")
+
+def _checked_files(files):
+    """Doppelte und ungültige Tages-Reports aussortieren und auf stderr melden.
+
+    Liefert die übrigen Dateien und ihre Zeilenzahlen aus dem Vorab-Scan.
+    """
+    from monatsanalyse.cache import dedupe_reports
+    from monatsanalyse.scan import scan_reports
+
+    kept, skipped = dedupe_reports(files)
+    for name, reason in skipped:
+        print(f"übersprungen: {name} ({reason})", file=sys.stderr)
+    valid, rejected = scan_reports([f for f, _, _ in kept], [h for _, _, h in kept])
+    for name, reason in rejected:
+        print(f"abgelehnt: {name} ({reason})", file=sys.stderr)
+    return [f for f, _ in valid], [scan['zeilen'] for _, scan in valid]
+
+def cmd_run(args):
+    """Wertet Tages-Reports aus und schreibt die Monatsanalyse als Excel."""
+    from monatsanalyse.budget import BudgetExceeded, build_report_within_budget
+
+    files, rows = _checked_files(args.files)
+    if not files:
+        return 2
+    try:
+        sheets = build_report_within_budget(files, rows=rows)
+    except BudgetExceeded as e:
+        print(e, file=sys.stderr)
+        return 2
+    _write_report(sheets, [os.path.basename(f) for f in files], args.output)
+    return 0
+
+def cmd_map(args):
+    """Verdichtet jede Datei zu Parquet-Teilsummen unter `--out`."""
+    from monatsanalyse.batch import map_file
+
+    for path in _checked_files(args.files)[0]:
+        print(map_file(path, args.out))
+    return 0
+
+def cmd_reduce(args):
+    """Fasst Map-Verzeichnisse zusammen und schreibt die Monatsanalyse."""
+    from monatsanalyse.batch import reduce_dirs
+
+    sheets, names = reduce_dirs(args.dirs)
+    _write_report(sheets, names, args.output)
+    return 0
+
+def cmd_batch(args):
+    """Map auf einem lokalen Prozess-Pool, danach Reduce."""
+    from monatsanalyse.batch import run_local
+    from monatsanalyse.budget import WORKERS
+
+    files, _ = _checked_files(args.files)
+    if not files:
+        return 2
+    sheets = run_local(files, workers=args.workers or WORKERS, out_root=args.keep)
+    _write_report(sheets, [os.path.basename(f) for f in files], args.output)
+    return 0
+
+def cmd_serve(args):
+    """JSON-API über dem Ergebnis-Cache starten."""
+    from monatsanalyse.api import serve
+    from monatsanalyse.cache import CACHE_PATH
+
+    serve(args.host, args.port, args.cache or CACHE_PATH)
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='monatsanalyse',
+        description="Fasst tägliche Ausbeute-Reports pro Auftrag und Dimension zusammen."
+    )
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help="Tages-Reports auswerten und als Excel schreiben")
+    run.add_argument('files', nargs='+', help="Ausbeuteanalyse_YYYY-MM-DD.xlsx-Dateien")
+    run.add_argument('-o', '--output', help="Zieldatei (Standard: monatsanalyse_<Zeitraum>.xlsx)")
+    run.set_defaults(func=cmd_run)
+
+    map_ = sub.add_parser('map', help="Dateien zu Parquet-Teilsummen verdichten (Map-Schritt)")
+    map_.add_argument('files', nargs='+')
+    map_.add_argument('--out', required=True, help="Zielverzeichnis für die Teilsummen")
+    map_.set_defaults(func=cmd_map)
+
+    reduce_ = sub.add_parser('reduce', help="Teilsummen zusammenführen und als Excel schreiben")
+    reduce_.add_argument('dirs', nargs='+', help="von `map` erzeugte Verzeichnisse")
+    reduce_.add_argument('-o', '--output')
+    reduce_.set_defaults(func=cmd_reduce)
+
+    batch = sub.add_parser('batch', help="Map/Reduce lokal auf mehreren Prozessen")
+    batch.add_argument('files', nargs='+')
+    batch.add_argument('-o', '--output')
+    batch.add_argument('-j', '--workers', type=int, help="Anzahl Map-Prozesse (Standard: MONATSANALYSE_WORKERS bzw. CPU-Kerne)")
+    batch.add_argument('--keep', help="Teilsummen hier ablegen statt in einem Temp-Verzeichnis")
+    batch.set_defaults(func=cmd_batch)
+
+    serve = sub.add_parser('serve', help="gespeicherte Zeiträume als JSON über HTTP bereitstellen")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8502)
+    serve.add_argument('--cache', help="Cache-Datenbank (Standard: MONATSANALYSE_CACHE)")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
@@ -0,0 +1,83 @@
+"""Normalisierung der Dimensionsangaben.
+
+"17x100", "17 x 100" und "17x100x4000" bezeichnen denselben Querschnitt,
+würden beim Gruppieren aber zu drei Schlüsseln. Jede verschiedene Angabe
+wird genau einmal in `(stärke, breite, länge)` zerlegt (prozessweit
+gemerkt) und auf ihren Querschnitt "17x100" abgebildet; gruppiert wird
+über kompakte Ganzzahl-IDs statt über die Zeichenketten.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+_NUMBER = r'(\d+(?:[.,]\d+)?)'
+DIMENSION_RE = re.compile(
+    rf'^\s*{_NUMBER}\s*[x×*]\s*{_NUMBER}(?:\s*[x×*]\s*{_NUMBER})?\s*(?:mm)?\s*$', re.IGNORECASE
+)
+
+def _number(text):
+    value = float(text.replace(',', '.'))
+    return int(value) if value.is_integer() else value
+
+@lru_cache(maxsize=None)
+def _groups(text):
+    m = DIMENSION_RE.match(text)
+    return None if m is None else m.groups()
+
+@lru_cache(maxsize=None)
+def parse_dimension(text):
+    """`(stärke, breite, länge)` aus einer Dimensionsangabe, `länge` None wenn nicht angegeben.
+
+    None, wenn die Angabe kein Maß der Form `S x B [x L]` ist.
+    """
+    groups = _groups(text)
+    if groups is None:
+        return None
+    staerke, breite, laenge = groups
+    return _number(staerke), _number(breite), None if laenge is None else _number(laenge)
+
+def cross_section(text):
+    """Querschnitt "SxB" einer Dimensionsangabe; Unlesbares bleibt (ohne Randleerzeichen) erhalten.
+
+    Die Zahlen bleiben so geschrieben wie im Report ("22,5x120" statt "22.5x120").
+    """
+    groups = _groups(text)
+    return text.strip() if groups is None else f'{groups[0]}x{groups[1]}'
+
+def dimension_ids(values):
+    """Ganzzahl-ID je Zeile und die zugehörigen Querschnitte: `(ids, querschnitte)`.
+
+    Gleich ist, was dieselbe `(stärke, breite)` ergibt ("22,5x120" und
+    "22.5 x 120", "17x100" und "17.0x100"); angezeigt wird die zuerst
+    gesehene Schreibweise. Unlesbare Angaben bilden je Text eine eigene
+    Gruppe. Die IDs folgen der Sortierung der Querschnitte, Gruppieren nach
+    ID ergibt also dieselbe Reihenfolge wie nach dem Text. Fehlende Angaben
+    bekommen -1.
+    """
+    codes, uniques = pd.factorize(values)
+    groups, labels, unique_ids = {}, [], []
+    for u in uniques:
+        text = str(u)
+        parts = parse_dimension(text)
+        key = parts[:2] if parts else text.strip()
+        if key not in groups:
+            groups[key] = len(labels)
+            labels.append(cross_section(text))
+        unique_ids.append(groups[key])
+    order = np.argsort(labels, kind='stable')
+    rank = np.empty(len(labels), dtype=np.intp)
+    rank[order] = np.arange(len(labels))
+    section_codes = rank[np.asarray(unique_ids, dtype=np.intp)]
+    sections = pd.Index([labels[i] for i in order])
+    ids = np.where(codes >= 0, section_codes[np.maximum(codes, 0)], -1) if len(sections) else codes
+    return ids, sections
+
+def cross_section_parts(sections):
+    """Stärke und Breite je Querschnitt als Spalten `Stärke_mm`, `Breite_mm` (NaN wenn unlesbar)."""
+    parts = [parse_dimension(s) or (np.nan, np.nan, None) for s in sections]
+    return pd.DataFrame({
+        'Stärke_mm': [p[0] for p in parts],
+        'Breite_mm': [p[1] for p in parts],
+    }, dtype=float)
@@ -0,0 +1,54 @@
+"""Excel-Export der Monatsanalyse."""
+import io
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from monatsanalyse.formatting import EXCEL_FLOAT_FORMAT, EXCEL_INT_FORMAT
+
+def _column_values(series):
+    """Spaltenwerte als Python-Objekte; fehlende und unendliche Werte werden zu leeren Zellen.
+
+    xlsxwriter lehnt NaN/INF in `write_number` ab, `Durchmesser` kann bei
+    Aufträgen ohne Stämme aber unendlich sein.
+    """
+    if pd.api.types.is_float_dtype(series.dtype):
+        valid = np.isfinite(series.to_numpy(dtype=float, na_value=np.nan))
+        if not valid.all():
+            series = series.astype(object).where(valid, None)
+    elif series.hasnans:
+        series = series.astype(object).where(series.notna(), None)
+    return series.tolist()
+
+def to_excel(sheets):
+    """Schreibt `{blattname: DataFrame}` in eine Excel-Datei im Memory.
+
+    Ein einziger xlsxwriter-Durchlauf im `constant_memory`-Modus: jede Zeile
+    wird einmal geschrieben und sofort in eine Temporärdatei gespült. Es entstehen nur
+    Werte, keine Formeln, Excel muss also nichts nachrechnen.
+    """
+    if isinstance(sheets, pd.DataFrame):
+        sheets = {'Monatsanalyse': sheets}
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    header_fmt = workbook.add_format({'bold': True})
+    date_fmt = workbook.add_format({'num_format': 'dd.mm.yyyy'})
+    float_fmt = workbook.add_format({'num_format': EXCEL_FLOAT_FORMAT})
+    int_fmt = workbook.add_format({'num_format': EXCEL_INT_FORMAT})
+    for name, df in sheets.items():
+        ws = workbook.add_worksheet(name)
+        ws.write_row(0, 0, list(df.columns), header_fmt)
+        # Rundung nur als Zellformat, die Zellen behalten die vollen Werte
+        for col, dtype in enumerate(df.dtypes):
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                ws.set_column(col, col, 11, date_fmt)
+            elif pd.api.types.is_float_dtype(dtype):
+                ws.set_column(col, col, None, float_fmt)
+            elif pd.api.types.is_integer_dtype(dtype):
+                ws.set_column(col, col, None, int_fmt)
+        columns = [_column_values(df[c]) for c in df.columns]
+        for row, values in enumerate(zip(*columns), start=1):
+            ws.write_row(row, 0, values)
+    workbook.close()
+    return output.getvalue()
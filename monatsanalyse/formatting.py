@@ -0,0 +1,20 @@
+"""Zahlenformate für die Anzeige.
+
+Gerechnet und gespeichert wird mit voller Genauigkeit; gerundet und mit
+deutschen Trennzeichen formatiert wird erst bei der Darstellung (App-Seite,
+Kennzahlen, Excel-Zellformat), ohne gerundete Kopie der Daten.
+"""
+DECIMALS = 3
+# Excel zeigt Tausender- und Dezimaltrennzeichen nach dem Gebietsschema des Nutzers an
+EXCEL_FLOAT_FORMAT = '#,##0.000'
+EXCEL_INT_FORMAT = '#,##0'
+
+_DE = str.maketrans(',.', '.,')
+
+def format_de(value, decimals=0):
+    """Zahl mit deutschen Trennzeichen, z. B. `format_de(12345.678, 1)` -> `12.345,7`."""
+    return f"{value:,.{decimals}f}".translate(_DE)
+
+def style_de(df, decimals=DECIMALS):
+    """Styler mit deutschen Zahlenformaten; nur für die angezeigte Seite gedacht."""
+    return df.style.format(precision=decimals, thousands='.', decimal=',', na_rep='')
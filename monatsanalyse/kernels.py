@@ -0,0 +1,91 @@
+"""Fusionierter Kernel für Durchmesser, Stärkeklasse und Vorschub auf Rohzeilen.
+
+Arbeitet direkt auf zusammenhängenden float64-Arrays ohne Zwischen-Series.
+Ist numba installiert, läuft alles in einer einzigen kompilierten Schleife,
+sonst in NumPy mit wiederverwendeten Ausgabepuffern.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from monatsanalyse.kpi import KLASSEN, KLASSEN_GRENZEN
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+def _log_kernel_loop(volumen, laenge, staemme, laufzeit, grenzen,
+                     durchmesser, klasse, vorschub, counts):
+    """Eine Schleife über alle Zeilen; Vorlage für die numba-Kompilierung."""
+    n_grenzen = len(grenzen)
+    for i in range(len(volumen)):
+        d = math.sqrt(volumen[i] / (math.pi * laenge[i] * staemme[i])) * 20000
+        k = 0
+        if d != d:
+            k = n_grenzen
+        else:
+            while k < n_grenzen and d >= grenzen[k]:
+                k += 1
+        durchmesser[i] = d
+        klasse[i] = k
+        counts[k] += 1
+        vorschub[i] = volumen[i] / (laufzeit[i] / 60) if laufzeit[i] != 0 else 0.0
+
+if numba is not None:
+    _log_kernel_jit = numba.njit(cache=True, nogil=True, error_model='numpy')(_log_kernel_loop)
+else:
+    _log_kernel_jit = None
+
+def _log_kernel_numpy(volumen, laenge, staemme, laufzeit, grenzen,
+                      durchmesser, klasse, vorschub, counts):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.multiply(laenge, staemme, out=durchmesser)
+        durchmesser *= np.pi
+        np.divide(volumen, durchmesser, out=durchmesser)
+        np.sqrt(durchmesser, out=durchmesser)
+        durchmesser *= 20000
+        np.divide(laufzeit, 60, out=vorschub)
+        np.divide(volumen, vorschub, out=vorschub, where=laufzeit != 0)
+        vorschub[laufzeit == 0] = 0
+    klasse[:] = np.searchsorted(grenzen, durchmesser, side='right')
+    counts[:] = np.bincount(klasse, minlength=len(counts))
+
+def log_metrics(volumen, laenge, staemme, laufzeit, use_numba=None):
+    """Durchmesser, Klassencode, Vorschub(FM/h) und Zeilen je Klasse in einem Durchlauf.
+
+    Der Klassencode indiziert `KLASSEN`; NaN-Durchmesser landen wie bei
+    `get_staerke_klasse` in "unbekannt".
+    """
+    arrays = [np.ascontiguousarray(a, dtype=np.float64) for a in (volumen, laenge, staemme, laufzeit)]
+    n = len(arrays[0])
+    durchmesser = np.empty(n)
+    klasse = np.empty(n, dtype=np.intp)
+    vorschub = np.empty(n)
+    counts = np.zeros(len(KLASSEN), dtype=np.int64)
+    grenzen = KLASSEN_GRENZEN.astype(np.float64)
+    if use_numba is None:
+        use_numba = _log_kernel_jit is not None
+    kernel = _log_kernel_jit if use_numba else _log_kernel_numpy
+    kernel(*arrays, grenzen, durchmesser, klasse, vorschub, counts)
+    return durchmesser, klasse, vorschub, counts
+
+def daily_class_histogram(df_all, weight='Stämme'):
+    """Stämme (oder Zeilen bei `weight=None`) je Tag und Stärkeklasse aus den Rohzeilen.
+
+    Ausgewertet werden die Gesamtzeilen (`Stämme != 0`) jedes Tages-Reports.
+    """
+    rows = df_all[df_all['Stämme'] != 0]
+    _, klasse, _, _ = log_metrics(
+        rows['Volumen_Eingang'].to_numpy(), rows['Durchschn_Stämme'].to_numpy(),
+        rows['Stämme'].to_numpy(), rows['Laufzeit_Minuten'].to_numpy()
+    )
+    tag, tage = pd.factorize(rows['Datum'], sort=True)
+    valid = tag >= 0
+    flat = tag[valid] * len(KLASSEN) + klasse[valid]
+    weights = rows[weight].to_numpy(np.float64)[valid] if weight else None
+    counts = np.bincount(flat, weights=weights, minlength=len(tage) * len(KLASSEN))
+    table = pd.DataFrame(counts.reshape(len(tage), len(KLASSEN)), columns=KLASSEN)
+    table.insert(0, 'Datum', tage)
+    return table
@@ -0,0 +1,79 @@
+"""Kennzahlen-Registry und vektorisierte Stärkeklassen."""
+import numpy as np
+
+# — Stärkeklassen: Untergrenzen in mm und zugehörige Bezeichnungen —
+KLASSEN_GRENZEN = np.array([100, 150, 200, 250, 300, 350, 400])
+KLASSEN = np.array(["0", "1a", "1b", "2a", "2b", "3a", "3b", "unbekannt"])
+
+def get_staerke_klasse(d):
+    """Ordnet Durchmesser (Skalar oder Spalte) vektorisiert ihrer Stärkeklasse zu."""
+    return KLASSEN[np.searchsorted(KLASSEN_GRENZEN, d, side='right')]
+
+# — KPI-Registry: jede Kennzahl genau einmal als Spaltenausdruck —
+KPI_REGISTRY = {}
+
+def kpi(name, *deps):
+    """Registriert eine Kennzahl mit ihren Abhängigkeiten (Spalten oder andere Kennzahlen)."""
+    def register(fn):
+        KPI_REGISTRY[name] = (deps, fn)
+        return fn
+    return register
+
+def _anteil(teil, basis):
+    return np.where(basis > 0, teil / basis * 100, 0)
+
+@kpi('Durchmesser', 'Volumen_Eingang', 'Durchschn_Stämme', 'Stämme')
+def _durchmesser(volumen, laenge, staemme):
+    return np.sqrt(volumen / (np.pi * laenge * staemme)) * 20000
+
+@kpi('Stärke_Klasse', 'Durchmesser')
+def _staerke_klasse(durchmesser):
+    return get_staerke_klasse(durchmesser)
+
+@kpi('Vorschub(FM/h)', 'Volumen_Eingang', 'Laufzeit_Minuten')
+def _vorschub(volumen, laufzeit):
+    return np.where(laufzeit != 0, volumen / (laufzeit / 60), 0)
+
+@kpi('Brutto_Ausschuss', 'Ausschuss', 'Brutto_Volumen')
+def _brutto_ausschuss(ausschuss, brutto):
+    return _anteil(ausschuss, brutto)
+
+@kpi('Brutto_Ausbeute', 'Brutto_Volumen', 'Volumen_Eingang')
+def _brutto_ausbeute(brutto, eingang):
+    return _anteil(brutto, eingang)
+
+@kpi('Netto_Ausbeute', 'Netto_Volumen', 'Volumen_Eingang')
+def _netto_ausbeute(netto, eingang):
+    return _anteil(netto, eingang)
+
+for _sorte in ['CE', 'SF', 'SI']:
+    kpi(f'{_sorte}_Anteil', _sorte, 'Brutto_Volumen')(_anteil)
+
+def resolve_kpis(names):
+    """Liefert die angefragten Kennzahlen samt Abhängigkeiten in Auswertungsreihenfolge."""
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'active':
+            raise ValueError(f"Zyklische KPI-Abhängigkeit: {' -> '.join(path + [name])}")
+        state[name] = 'active'
+        for dep in KPI_REGISTRY[name][0]:
+            if dep in KPI_REGISTRY:
+                visit(dep, path + [name])
+        state[name] = 'done'
+        order.append(name)
+
+    for name in names:
+        if name not in KPI_REGISTRY:
+            raise KeyError(f"Unbekannte Kennzahl: {name}")
+        visit(name, [])
+    return order
+
+def compute_kpis(df, names):
+    """Berechnet die angefragten Kennzahlen spaltenweise und hängt sie an `df` an."""
+    for name in resolve_kpis(names):
+        deps, fn = KPI_REGISTRY[name]
+        df[name] = fn(*(df[d] for d in deps))
+    return df
@@ -0,0 +1,254 @@
+"""Einlesen der Tages-Reports, Aggregation und Original-Layout."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from monatsanalyse.anomalies import find_anomalies
+from monatsanalyse.cache import report_date
+from monatsanalyse.dimensions import cross_section_parts, dimension_ids
+from monatsanalyse.kernels import daily_class_histogram
+from monatsanalyse.kpi import compute_kpis
+from monatsanalyse.scan import REPORT_COLUMNS
+
+def _file_name(f):
+    return os.path.basename(f if isinstance(f, (str, os.PathLike)) else f.name)
+
+def read_reports(files):
+    """Liest Tages-Reports (Pfade oder Datei-Objekte) in ein gemeinsames `df_all`.
+
+    Gelesen werden nur die `REPORT_COLUMNS`; jede Zeile bekommt das
+    Berichtsdatum aus dem Dateinamen als `Datum`.
+    """
+    dfs = []
+    for f in files:
+        df = pd.read_excel(f, usecols=lambda c: c in REPORT_COLUMNS)
+        df['Datum'] = pd.Timestamp(report_date(_file_name(f)) or pd.NaT)
+        dfs.append(df)
+    return pd.concat(dfs, ignore_index=True)
+
+# — Layout: Gesamtzeile je Auftrag, darunter seine Dimensionszeilen —
+FINAL_COLS = [
+    'Auftrag','Dimension',
+    'Stämme','Volumen_Eingang','Durchschn_Stämme','Teile_gesamt',
+    'Durchmesser','Stärke_Klasse','Laufzeit_Minuten','Vorschub(FM/h)',
+    'Brutto_Volumen','Brutto_Ausschuss','Netto_Volumen',
+    'Brutto_Ausbeute','Netto_Ausbeute',
+    'CE','SF','SI','IND','NSI','Q_V','Ausschuss'
+]
+OVERALL_KPIS = ['Durchmesser', 'Stärke_Klasse', 'Vorschub(FM/h)']
+DIM_KPIS = ['Brutto_Ausschuss', 'Brutto_Ausbeute', 'Netto_Ausbeute']
+
+# — Summenblätter des Exports —
+OVERALL_SUMS = ['Stämme', 'Volumen_Eingang', 'Teile_gesamt', 'Laufzeit_Minuten']
+DIM_SUMS = ['Brutto_Volumen', 'Netto_Volumen', 'CE', 'SF', 'SI', 'IND', 'NSI', 'Q_V', 'Ausschuss']
+SUMMARY_KPIS = ['Vorschub(FM/h)', 'Brutto_Ausschuss', 'Brutto_Ausbeute', 'Netto_Ausbeute']
+DIMENSION_KPIS = ['Brutto_Ausschuss', 'CE_Anteil', 'SF_Anteil', 'SI_Anteil']
+
+def sorted_left_join(left, right, key):
+    """Left-Join zweier nach `key` sortierter Frames per Binärsuche statt Hash-Join.
+
+    Die Reihenfolge von `left` bleibt erhalten; mehrere Treffer in `right`
+    folgen in ihrer Reihenfolge aufeinander (wie `pd.merge` + stabile Sortierung).
+    Zurück kommen der Join und eine Maske der Zeilen mit Treffer.
+    """
+    lkeys = left[key].to_numpy()
+    rkeys = right[key].to_numpy()
+    # Sortierte Schlüssel: nur die Blockanfänge links müssen gesucht werden
+    new_block = np.r_[True, lkeys[1:] != lkeys[:-1]][:len(lkeys)]
+    block = np.cumsum(new_block) - 1
+    unique_keys = lkeys[new_block]
+    lo = np.searchsorted(rkeys, unique_keys, side='left')[block]
+    hi = np.searchsorted(rkeys, unique_keys, side='right')[block]
+    counts = hi - lo
+    matched = counts > 0
+    right = right.drop(columns=key)
+    if (counts == 1).all():
+        # Häufigster Fall: genau ein Treffer je Zeile, reine Positionsauswahl
+        left_part, right_part = left, right.take(lo)
+    else:
+        counts = np.maximum(counts, 1)
+        li = np.repeat(np.arange(len(left)), counts)
+        offset = np.arange(len(li)) - np.repeat(np.cumsum(counts) - counts, counts)
+        matched = np.repeat(matched, counts)
+        ri = np.where(matched, np.repeat(lo, counts) + offset, -1)
+        left_part = left.take(li)
+        right_part = right.reset_index(drop=True).reindex(ri)
+    left_part = left_part.reset_index(drop=True)
+    right_part.index = left_part.index
+    joined = pd.concat([left_part, right_part], axis=1)
+    return joined, matched
+
+def build_final_df(df_all):
+    """Aggregiert die Tageszeilen pro Auftrag/Dimension und baut das Original-Layout."""
+    return build_report(df_all, summaries=False)['Monatsanalyse']
+
+def build_report(df_all, summaries=True):
+    """Ein Aggregationsdurchlauf für alle Blätter der Monatsanalyse.
+
+    Liefert `{blattname: DataFrame}`: das Original-Layout (`Monatsanalyse`)
+    und, falls `summaries`, Summen je Stärkeklasse, Dimension und Tag sowie
+    die Stämme je Tag und Stärkeklasse der einzelnen Tages-Gesamtzeilen und
+    die auffälligen Tage je Auftrag/Dimension.
+    """
+    return reduce_partials([partial_aggregate(df_all, per_day=summaries)], summaries)
+
+# — Map/Reduce: Teilsummen je Datei, die sich beliebig zusammenfassen lassen —
+PARTIAL_KEYS = {
+    'overall': ['Auftragsnummer', 'Auftrag_clean'],
+    'dim': ['Auftragsnummer', 'Dimension'],
+    'tage': ['Datum'],
+    'klassen_tag': ['Datum'],
+    'tag_auftrag': ['Datum', 'Auftragsnummer'],
+    'tag_dim': ['Datum', 'Auftragsnummer', 'Dimension'],
+}
+
+def _sums(overall, dim, by):
+    """Summen je `by` aus Gesamt- und Dimensionsanteil."""
+    return (
+        overall.groupby(by)[OVERALL_SUMS].sum()
+        .join(dim.groupby(by)[DIM_SUMS].sum(), how='outer')
+        .fillna(0)
+        .reset_index()
+    )
+
+def partial_aggregate(df_all, per_day=True):
+    """Map-Schritt: Teilsummen eines beliebigen Ausschnitts der Tageszeilen.
+
+    Statt des Mittelwerts von `Durchschn_Stämme` werden Summe und Anzahl
+    geführt, damit sich Teilergebnisse verlustfrei addieren lassen.
+    """
+    # — Auftragsnummer & cleanen
+    df_all['Auftragsnummer'] = df_all['Auftrag'].astype(str).str.extract(r'^(\d{5})')
+    df_all['Auftrag_clean'] = df_all['Auftrag'].astype(str).str.extract(
+        r'^(\d{5}\s*-\s*(?:[A-Za-zÄÖÜäöü]*\s*)?\d+x\d+(?:x\d+)?)'
+    )[0]
+
+    # — Trennen Gesamt- vs. Dimensionszeilen
+    df_overall = df_all[df_all['Stämme'] != 0]
+    df_dim     = df_all[df_all['Stämme'] == 0]
+
+    # — Dimensionen auf ihren Querschnitt normalisieren; gruppiert wird über Ganzzahl-IDs
+    dim_ids, sections = dimension_ids(df_dim['Dimension'])
+    df_dim = df_dim.assign(Dimension=dim_ids)[dim_ids >= 0]
+
+    def with_sections(df):
+        return df.assign(Dimension=sections.take(df['Dimension'].to_numpy()))
+
+    partial = {
+        'overall': (
+            df_overall
+            .groupby(PARTIAL_KEYS['overall'], as_index=False)
+            .agg(**{
+                'Stämme': ('Stämme', 'sum'),
+                'Volumen_Eingang': ('Volumen_Eingang', 'sum'),
+                'Durchschn_Stämme_sum': ('Durchschn_Stämme', 'sum'),
+                'Durchschn_Stämme_n': ('Durchschn_Stämme', 'count'),
+                'Teile': ('Teile', 'sum'),
+                'Laufzeit_Minuten': ('Laufzeit_Minuten', 'sum'),
+            })
+        ),
+        'dim': with_sections(
+            df_dim.groupby(PARTIAL_KEYS['dim'], as_index=False)[['Teile', *DIM_SUMS]].sum()
+        ),
+    }
+    if per_day and 'Datum' in df_all:
+        partial['tage'] = _sums(df_overall.rename(columns={'Teile': 'Teile_gesamt'}), df_dim, 'Datum')
+        partial['klassen_tag'] = daily_class_histogram(df_all)
+        partial['tag_auftrag'] = (
+            df_overall.groupby(PARTIAL_KEYS['tag_auftrag'], as_index=False)[['Volumen_Eingang']].sum()
+        )
+        partial['tag_dim'] = with_sections(
+            df_dim.groupby(PARTIAL_KEYS['tag_dim'], as_index=False)
+            [['Brutto_Volumen', 'Netto_Volumen', 'Ausschuss']].sum()
+        )
+    return partial
+
+def combine_partials(partials):
+    """Addiert Teilsummen mit gleichem Schlüssel; Ergebnis ist nach Schlüssel sortiert."""
+    combined = {}
+    for kind, keys in PARTIAL_KEYS.items():
+        frames = [p[kind] for p in partials if kind in p]
+        if len(frames) == 1:
+            combined[kind] = frames[0]
+        elif frames:
+            combined[kind] = pd.concat(frames, ignore_index=True).groupby(keys, as_index=False).sum()
+    return combined
+
+def reduce_partials(partials, summaries=True):
+    """Reduce-Schritt: Teilsummen zusammenführen, dann Kennzahlen und Layout."""
+    combined = combine_partials(partials)
+
+    # — Aggregation Gesamt
+    overall = combined['overall']
+    agg_overall = (
+        overall[['Auftragsnummer', 'Auftrag_clean', 'Stämme', 'Volumen_Eingang']]
+        .assign(**{
+            'Durchschn_Stämme': overall['Durchschn_Stämme_sum'] / overall['Durchschn_Stämme_n'],
+            'Teile_gesamt': overall['Teile'],
+            'Laufzeit_Minuten': overall['Laufzeit_Minuten'],
+        })
+        .rename(columns={'Auftrag_clean': 'Auftrag'})
+    )
+    compute_kpis(agg_overall, OVERALL_KPIS)
+
+    # — Aggregation Dimensionen
+    grouped_dim = combined['dim'].rename(columns={'Teile': 'Teile_dim'})
+
+    # — Merge & Zusatzkennzahlen (beide Seiten sind bereits nach Auftragsnummer sortiert)
+    merged, matched = sorted_left_join(grouped_dim, agg_overall, 'Auftragsnummer')
+    merged = merged[matched].reset_index(drop=True)
+    compute_kpis(merged, DIM_KPIS)
+
+    # — Original‑Layout rekonstruieren (ohne Zeilenschleife und ohne Neusortierung)
+    keys = merged['Auftragsnummer'].to_numpy()
+    new_block = np.r_[True, keys[1:] != keys[:-1]][:len(keys)]
+    block_start = np.flatnonzero(new_block)
+    block = np.cumsum(new_block) - 1
+
+    overall_only = FINAL_COLS[2:10]
+    dim_only = FINAL_COLS[10:]
+    head = (
+        merged.iloc[block_start]
+        .assign(Dimension='', **{c: 0 for c in dim_only})
+    )
+    body = (
+        merged
+        .drop(columns='Teile_gesamt')
+        .rename(columns={'Teile_dim': 'Teile_gesamt'})
+        .assign(**{c: 0 for c in overall_only if c != 'Teile_gesamt'})
+        .assign(**{'Stärke_Klasse': ''})
+    )
+    # Gesamtzeile g landet vor ihrem Block, Dimensionszeile i rückt um g+1 Zeilen nach
+    take = np.empty(len(head) + len(body), dtype=np.intp)
+    take[block_start + np.arange(len(head))] = np.arange(len(head))
+    take[np.arange(len(body)) + block + 1] = len(head) + np.arange(len(body))
+    final_df = (
+        pd.concat([head[FINAL_COLS], body[FINAL_COLS]], ignore_index=True)
+        .take(take)
+        .reset_index(drop=True)
+    )
+
+    # — Volle Genauigkeit; gerundet wird erst bei der Darstellung (`monatsanalyse.formatting`)
+    report = {'Monatsanalyse': final_df}
+    if not summaries:
+        return report
+
+    # — Summenblätter aus denselben Aggregaten (Klasse des Auftrags gilt für seine Dimensionen)
+    orders = merged.iloc[block_start]
+    report['Stärkeklassen'] = compute_kpis(_sums(orders, merged, 'Stärke_Klasse'), SUMMARY_KPIS)
+    dimensions = (
+        merged.groupby('Dimension', as_index=False)[['Teile_dim', *DIM_SUMS]].sum()
+        .rename(columns={'Teile_dim': 'Teile'})
+    )
+    # Stärke/Breite als Zahlen, damit sich nach Querschnitt filtern und auswerten lässt
+    parts = cross_section_parts(dimensions['Dimension'])
+    dimensions.insert(1, 'Stärke_mm', parts['Stärke_mm'].to_numpy())
+    dimensions.insert(2, 'Breite_mm', parts['Breite_mm'].to_numpy())
+    report['Dimensionen'] = compute_kpis(dimensions, DIMENSION_KPIS)
+    if 'tage' in combined:
+        report['Tage'] = compute_kpis(combined['tage'].copy(), SUMMARY_KPIS)
+        report['Stärkeklassen je Tag'] = combined['klassen_tag']
+    if 'tag_auftrag' in combined:
+        report['Auffälligkeiten'] = find_anomalies(combined['tag_auftrag'], combined['tag_dim'])
+    return report
@@ -0,0 +1,57 @@
+"""Prozessweite Ergebnis-Registry für mehrere gleichzeitige App-Sitzungen.
+
+Öffnen mehrere Leute denselben Zeitraum, soll nur eine Sitzung die Dateien
+einlesen und aggregieren. Die Registry hält fertige Ergebnisse je Schlüssel
+(aus den Inhalts-Hashes) im Speicher und schützt jede Berechnung mit einer
+eigenen Sperre: wer später kommt, wartet auf die laufende Berechnung und
+bekommt deren Ergebnis, statt selbst zu rechnen.
+"""
+import threading
+from collections import OrderedDict
+
+class ResultRegistry:
+    """Ergebnisse je Schlüssel, höchstens `max_entries` (zuletzt benutzte bleiben)."""
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._results = OrderedDict()
+
+    def pending(self, key):
+        """True, wenn gerade eine andere Sitzung `key` berechnet."""
+        with self._lock:
+            lock = self._key_locks.get(key)
+        return lock is not None and lock.locked()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        return None
+
+    def get_or_compute(self, key, compute):
+        """Liefert das Ergebnis zu `key`; `compute()` läuft je Schlüssel höchstens einmal gleichzeitig.
+
+        Schlägt `compute` fehl oder liefert es None (z. B. Zeitraum nicht
+        mehr im Cache), wird nichts gespeichert und der nächste Wartende
+        versucht es selbst.
+        """
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            lock = self._key_locks.setdefault(key, threading.Lock())
+        with lock:
+            result = self.get(key)
+            if result is not None:
+                return result
+            result = compute()
+            with self._lock:
+                if result is not None:
+                    self._results[key] = result
+                    while len(self._results) > self.max_entries:
+                        self._results.popitem(last=False)
+                self._key_locks.pop(key, None)
+        return result
@@ -0,0 +1,102 @@
+"""Schneller Vorab-Scan der Tages-Reports.
+
+Liest je `.xlsx` nur die Kopfzeile und die Blattgröße (`<dimension>` im
+Sheet-XML) über openpyxl im read-only-Modus, ohne Zellen zu parsen. So
+werden Dateien im falschen Format in Millisekunden statt nach einem vollen
+`pd.read_excel` abgelehnt, und die Zeilenzahlen stehen für Fortschritts-
+anzeige und Parallelisierungsentscheidung schon vor dem Einlesen fest.
+Ergebnisse werden je Inhalts-Hash prozessweit gemerkt, damit die App nicht
+bei jedem Rerun dieselben Uploads erneut öffnet.
+"""
+import threading
+from collections import OrderedDict
+
+from monatsanalyse.cache import file_name
+
+# Spalten, die Aggregation und Kennzahlen tatsächlich lesen
+REPORT_COLUMNS = [
+    'Auftrag', 'Dimension', 'Stämme', 'Volumen_Eingang', 'Durchschn_Stämme', 'Teile',
+    'Laufzeit_Minuten', 'Brutto_Volumen', 'Netto_Volumen',
+    'CE', 'SF', 'SI', 'IND', 'NSI', 'Q_V', 'Ausschuss',
+]
+
+# Scan-Ergebnis bzw. Ablehnungsgrund je Inhalts-Hash, zuletzt benutzte bleiben
+SCAN_CACHE_ENTRIES = 4096
+_scans = OrderedDict()
+_scans_lock = threading.Lock()
+
+class InvalidReport(ValueError):
+    """Die Datei ist kein lesbarer Tages-Report."""
+
+def scan_report(f):
+    """Kopfzeile und Datenzeilen einer Datei als `{'name', 'zeilen', 'spalten'}`.
+
+    Alte `.xls`-Dateien lassen sich so nicht scannen; für sie sind
+    `zeilen` und `spalten` None und die Prüfung entfällt. Löst
+    `InvalidReport` aus, wenn die Datei unlesbar ist oder Spalten fehlen.
+    """
+    from openpyxl import load_workbook
+
+    name = file_name(f)
+    if name.lower().endswith('.xls'):
+        return {'name': name, 'zeilen': None, 'spalten': None}
+    wb = None
+    try:
+        wb = load_workbook(f, read_only=True, data_only=True)
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(max_row=1, values_only=True), None)
+        # Ohne <dimension> im XML (manche Exporter lassen sie weg) wird gezählt
+        max_row = ws.max_row if ws.max_row is not None else sum(1 for _ in ws.iter_rows())
+    except Exception as e:
+        # openpyxl meldet kaputte Dateien je nach Teil unterschiedlich (BadZipFile,
+        # InvalidFileException, ParseError bei defektem XML, KeyError, IndexError, …)
+        raise InvalidReport(f"keine gültige .xlsx-Datei ({type(e).__name__}: {e})") from None
+    finally:
+        if wb is not None:
+            wb.close()
+        if hasattr(f, 'seek'):
+            f.seek(0)
+    if not header:
+        raise InvalidReport("leeres Tabellenblatt")
+    columns = [str(c) for c in header if c is not None]
+    missing = [c for c in REPORT_COLUMNS if c not in columns]
+    if missing:
+        raise InvalidReport(f"Spalten fehlen: {', '.join(missing)}")
+    return {'name': name, 'zeilen': max_row - 1, 'spalten': columns}
+
+def _scan_cached(f, digest):
+    with _scans_lock:
+        if digest in _scans:
+            _scans.move_to_end(digest)
+            return _scans[digest]
+    try:
+        scan = scan_report(f)
+        result = {'zeilen': scan['zeilen'], 'spalten': scan['spalten']}, None
+    except InvalidReport as e:
+        result = None, str(e)
+    with _scans_lock:
+        _scans[digest] = result
+        while len(_scans) > SCAN_CACHE_ENTRIES:
+            _scans.popitem(last=False)
+    return result
+
+def scan_reports(files, digests=None):
+    """Scannt alle Dateien; liefert `(gueltig, abgelehnt)` als `[(datei, scan)]` und `[(name, grund)]`.
+
+    Mit `digests` (Inhalts-Hashes je Datei, z. B. aus `dedupe_reports`)
+    wird jeder Inhalt nur einmal je Prozess gescannt.
+    """
+    valid, rejected = [], []
+    for f, digest in zip(files, digests or [None] * len(files)):
+        if digest is None:
+            try:
+                valid.append((f, scan_report(f)))
+            except InvalidReport as e:
+                rejected.append((file_name(f), str(e)))
+            continue
+        scan, reason = _scan_cached(f, digest)
+        if scan is None:
+            rejected.append((file_name(f), reason))
+        else:
+            valid.append((f, {'name': file_name(f), **scan}))
+    return valid, rejected
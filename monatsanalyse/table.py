@@ -0,0 +1,32 @@
+"""Seitenweise Sicht auf die Detailtabelle."""
+import pandas as pd
+
+# — Detailtabelle: serverseitig filtern, sortieren und nur eine Seite ausliefern —
+PAGE_SIZES = [50, 100, 250, 500]
+
+def filter_sort_page(final_df, auftrag='', dimensionen=(), klassen=(),
+                     sort_by=None, ascending=True, page=1, page_size=100):
+    """Liefert `(seite, treffer, seiten)`; nur `seite` geht an den Browser.
+
+    Dimensions- und Klassenfilter behalten die Gesamtzeile des Auftrags bei,
+    die Stärke_Klasse der Gesamtzeile gilt auch für ihre Dimensionszeilen.
+    """
+    is_head = final_df['Dimension'] == ''
+    block = is_head.cumsum()
+    mask = pd.Series(True, index=final_df.index)
+    if auftrag:
+        mask &= final_df['Auftrag'].astype(str).str.contains(auftrag, case=False, regex=False)
+    if dimensionen:
+        dim_hit = final_df['Dimension'].isin(dimensionen)
+        mask &= dim_hit | (is_head & block.isin(block[dim_hit]))
+    if klassen:
+        klasse = final_df['Stärke_Klasse'].where(is_head).ffill()
+        mask &= klasse.isin(klassen)
+
+    view = final_df[mask]
+    if sort_by:
+        view = view.sort_values(sort_by, ascending=ascending, kind='stable')
+    total = len(view)
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    return view.iloc[(page - 1) * page_size: page * page_size], total, pages
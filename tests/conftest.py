@@ -0,0 +1,20 @@
+import io
+
+import pytest
+
+from benchmarks.synthetic import make_reports
+
+def as_uploads(reports):
+    """Synthetische Reports als Excel-Dateiobjekte mit `.name`, wie Streamlit sie liefert."""
+    uploads = []
+    for name, df in reports:
+        buf = io.BytesIO()
+        df.to_excel(buf, index=False)
+        buf.name = name
+        uploads.append(buf)
+    return uploads
+
+@pytest.fixture(scope='session')
+def report_files():
+    """Fünf feste Tages-Reports, Grundlage der Golden-Snapshots."""
+    return as_uploads(make_reports(n_days=5, seed=7, n_orders=25, n_dims=4, order_pool=60))
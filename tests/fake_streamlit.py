@@ -0,0 +1,38 @@
+"""Minimaler Streamlit-Ersatz, um die `main()` der App-Fassungen headless auszuführen."""
+import contextlib
+
+class FakeStreamlit:
+    """Liefert feste Uploads und merkt sich alle an `st.dataframe` übergebenen Frames."""
+
+    def __init__(self, files):
+        self.files = files
+        self.frames = []
+        self.sidebar = self
+
+    def file_uploader(self, *args, **kwargs):
+        for f in self.files:
+            f.seek(0)
+        return self.files
+
+    def dataframe(self, df, *args, **kwargs):
+        self.frames.append(df)
+
+    def columns(self, spec):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    @contextlib.contextmanager
+    def expander(self, *args, **kwargs):
+        yield self
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+def run_app(module, files):
+    """Führt `module.main()` mit `files` als Upload aus und liefert das angezeigte final_df."""
+    fake = FakeStreamlit(files)
+    original, module.st = module.st, fake
+    try:
+        module.main()
+    finally:
+        module.st = original
+    return fake.frames[-1]
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+
+from monatsanalyse.anomalies import find_anomalies, rolling_zscores
+
+def daily_frames(days=30, spike_day=20):
+    """Zwei Aufträge mit stabiler Ausbeute, Auftrag 10001 hat an `spike_day` einen Einbruch."""
+    datum = pd.date_range('2025-01-01', periods=days)
+    tag_auftrag = pd.DataFrame({
+        'Datum': np.tile(datum, 2),
+        'Auftragsnummer': np.repeat(['10001', '10002'], days),
+        'Volumen_Eingang': 100.0,
+    })
+    netto = 60 + np.tile([-1.0, 1.0], days)
+    netto[spike_day] = 20
+    tag_dim = tag_auftrag[['Datum', 'Auftragsnummer']].assign(
+        Dimension='22x120', Brutto_Volumen=netto / 0.9, Netto_Volumen=netto, Ausschuss=netto * 0.05
+    )
+    return tag_auftrag, tag_dim
+
+def test_zscore_uses_only_previous_days():
+    df = pd.DataFrame({
+        'Datum': pd.date_range('2025-01-01', periods=6),
+        'Auftragsnummer': '10001',
+        'Netto_Ausbeute': [1.0, 2.0, 3.0, 4.0, 5.0, 100.0],
+    })
+    out = rolling_zscores(df, ['Auftragsnummer'], ['Netto_Ausbeute'], window=3, min_periods=3)
+    assert out['Netto_Ausbeute_z'].iloc[:3].isna().all()
+    assert out['Netto_Ausbeute_mittel'].iloc[5] == 4.0
+    assert out['Netto_Ausbeute_z'].iloc[5] == (100.0 - 4.0) / 1.0
+
+def test_find_anomalies_flags_the_spike_on_both_levels():
+    tag_auftrag, tag_dim = daily_frames()
+    anomalies = find_anomalies(tag_auftrag, tag_dim)
+    netto = anomalies[anomalies['Kennzahl'] == 'Netto_Ausbeute']
+    assert set(netto['Ebene']) == {'Auftrag', 'Dimension'}
+    assert (netto['Auftragsnummer'] == '10001').all()
+    assert (netto['Datum'] == pd.Timestamp('2025-01-21')).all()
+    assert (netto['z'] < -5).all()
+    assert np.abs(anomalies['z']).is_monotonic_decreasing
+
+def year_of_noise(seed=1, days=250, orders=40, dims=5):
+    """Ein Jahr stationäres Rauschen ohne echte Ausreißer."""
+    rng = np.random.default_rng(seed)
+    datum = np.repeat(pd.date_range('2024-01-01', periods=days), orders)
+    nummern = np.tile([str(10000 + i) for i in range(orders)], days)
+    tag_auftrag = pd.DataFrame({'Datum': datum, 'Auftragsnummer': nummern,
+                                'Volumen_Eingang': rng.normal(100, 5, days * orders)})
+    tag_dim = tag_auftrag.loc[tag_auftrag.index.repeat(dims), ['Datum', 'Auftragsnummer']]
+    tag_dim['Dimension'] = np.tile([f'22x{100 + 20 * d}' for d in range(dims)], days * orders)
+    brutto = rng.normal(20, 2, len(tag_dim))
+    return tag_auftrag, tag_dim.assign(
+        Brutto_Volumen=brutto, Netto_Volumen=brutto * rng.normal(.6, .02, len(tag_dim)),
+        Ausschuss=brutto * rng.normal(.05, .005, len(tag_dim)),
+    )
+
+def test_stationary_noise_is_not_flagged():
+    tag_auftrag, tag_dim = year_of_noise()
+    # Rund 120.000 Vergleiche (zwei Kennzahlen je Auftrags- und Dimensionstag)
+    assert len(find_anomalies(tag_auftrag, tag_dim)) <= 20
+
+def test_year_of_order_days_runs_well_under_a_second():
+    tag_auftrag, tag_dim = year_of_noise()
+
+    import time
+    start = time.perf_counter()
+    find_anomalies(tag_auftrag, tag_dim)
+    assert time.perf_counter() - start < 0.5
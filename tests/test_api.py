@@ -0,0 +1,73 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from monatsanalyse import cache
+from monatsanalyse.api import make_server
+from monatsanalyse.pipeline import build_report, read_reports
+
+@pytest.fixture
+def api(tmp_path, report_files):
+    path = str(tmp_path / 'cache.sqlite')
+    sheets = build_report(read_reports(report_files))
+    info = cache.period_info([f.name for f in report_files])
+    key = cache.cache_key(info, [cache.file_hash(f) for f in report_files])
+    with cache.open_cache(path) as con:
+        cache.cache_store(con, key, [(f.name, cache.file_hash(f)) for f in report_files], sheets,
+                          {**info, 'total_input_volume': 1.0, 'total_brutto': 2.0})
+    server = make_server(port=0, cache_path=path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}', key, sheets
+    server.shutdown()
+    server.server_close()
+
+def get(url, etag=None):
+    request = urllib.request.Request(url, headers={'If-None-Match': etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers.get('ETag'), json.loads(response.read() or 'null')
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers.get('ETag'), None
+
+def test_periods_orders_and_dimensions(api):
+    base, key, sheets = api
+    status, _, periods = get(f'{base}/zeitraeume')
+    assert status == 200 and [p['schluessel'] for p in periods] == [key]
+
+    _, _, summary = get(f'{base}/zeitraeume/{key}')
+    assert summary['kennzahlen']['total_brutto'] == 2.0
+    assert len(summary['tage']) == len(sheets['Tage'])
+
+    final_df = sheets['Monatsanalyse']
+    _, _, orders = get(f'{base}/zeitraeume/{key}/auftraege')
+    assert len(orders['zeilen']) == (final_df['Dimension'] == '').sum()
+    _, _, dims = get(f'{base}/zeitraeume/{key}/dimensionen')
+    assert len(dims['zeilen']) == (final_df['Dimension'] != '').sum()
+    nummer = orders['zeilen'][0]['Auftrag'][:5]
+    _, _, one = get(f'{base}/zeitraeume/{key}/dimensionen?auftrag={nummer}')
+    assert one['zeilen'] and all(r['Auftrag'][:5] == nummer for r in one['zeilen'])
+    # Eine Nummer, die Anfang anderer Nummern ist, trifft nur genau sich selbst
+    assert sum(o['Auftrag'].startswith(nummer[:4]) for o in orders['zeilen']) > 1
+    _, _, prefix = get(f'{base}/zeitraeume/{key}/dimensionen?auftrag={nummer[:4]}')
+    assert prefix['zeilen'] == []
+
+    assert get(f'{base}/zeitraeume/unbekannt')[0] == 404
+    assert get(f'{base}/anderes')[0] == 404
+
+def test_repeated_polling_is_answered_with_304(api):
+    base, key, _ = api
+    url = f'{base}/zeitraeume/{key}/auftraege'
+    status, etag, _ = get(url)
+    assert status == 200 and etag
+    assert get(url, etag)[:2] == (304, etag)
+    # Andere Sicht, anderes ETag
+    assert get(f'{base}/zeitraeume/{key}/dimensionen')[1] != etag
+
+    start = time.perf_counter()
+    for _ in range(50):
+        assert get(url, etag)[0] == 304
+    assert (time.perf_counter() - start) / 50 < 0.02
@@ -0,0 +1,62 @@
+import io
+import os
+
+import pyarrow as pa
+import pytest
+
+from monatsanalyse import arrow_cache
+from monatsanalyse.pipeline import build_report, read_reports, reduce_partials
+
+def test_report_roundtrip_is_memory_mapped(tmp_path, report_files):
+    f = report_files[0]
+    df = arrow_cache.cached_report(f, cache_dir=str(tmp_path))
+    before = pa.total_allocated_bytes()
+    loaded = arrow_cache.load_frame(arrow_cache.entry_key(f), 'report', str(tmp_path))
+    # Zahlenspalten zeigen in die Memory-Map, Arrow muss nichts allozieren
+    assert pa.total_allocated_bytes() - before < 4096
+    assert not loaded['Volumen_Eingang'].to_numpy().flags.writeable
+    assert loaded.equals(df.astype(loaded.dtypes.to_dict()))
+
+def test_cached_partials_reproduce_report_without_reparsing(tmp_path, report_files, monkeypatch):
+    expected = build_report(read_reports(report_files))
+    first = reduce_partials([arrow_cache.cached_partial(f, cache_dir=str(tmp_path)) for f in report_files])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Datei wurde trotz Cache-Treffer erneut eingelesen")
+    monkeypatch.setattr(arrow_cache, 'read_reports', fail)
+    second = reduce_partials([arrow_cache.cached_partial(f, cache_dir=str(tmp_path)) for f in report_files])
+
+    for sheets in (first, second):
+        assert list(sheets) == list(expected)
+        assert sheets['Monatsanalyse'].equals(expected['Monatsanalyse'])
+
+@pytest.mark.parametrize('kind', ['report', 'partial3-overall'])
+def test_missing_entry_returns_none(tmp_path, kind):
+    assert arrow_cache.load_frame('0' * 64, kind, str(tmp_path)) is None
+
+def test_same_content_under_another_date_is_a_separate_entry(tmp_path, report_files):
+    f = report_files[0]
+    renamed = io.BytesIO(f.getvalue())
+    renamed.name = 'Ausbeuteanalyse_2030-06-01.xlsx'
+    arrow_cache.cached_partial(f, cache_dir=str(tmp_path))
+    assert not arrow_cache.partial_cached(renamed, cache_dir=str(tmp_path))
+    report = arrow_cache.cached_report(renamed, cache_dir=str(tmp_path))
+    assert (report['Datum'] == '2030-06-01').all()
+    assert arrow_cache.partial_cached(f, cache_dir=str(tmp_path))
+
+def test_prune_drops_least_recently_used_entries(tmp_path, report_files):
+    cache_dir = str(tmp_path)
+    for f in report_files[:3]:
+        arrow_cache.cached_partial(f, cache_dir=cache_dir)
+    sizes = {}
+    for name in os.listdir(cache_dir):
+        key = name.split('.', 1)[0]
+        sizes[key] = sizes.get(key, 0) + os.path.getsize(os.path.join(cache_dir, name))
+    # Den ältesten Eintrag wieder benutzen, damit der zweite am längsten ungenutzt ist
+    first, second, third = (arrow_cache.entry_key(f) for f in report_files[:3])
+    for name in os.listdir(cache_dir):
+        key = name.split('.', 1)[0]
+        os.utime(os.path.join(cache_dir, name), (0, {first: 3, second: 1, third: 2}[key]))
+    arrow_cache.load_frame(first, 'report', cache_dir)
+    assert arrow_cache.prune_cache(cache_dir, max_mb=(sizes[first] + sizes[third]) / 2**20) > 0
+    assert {name.split('.', 1)[0] for name in os.listdir(cache_dir)} == {first, third}
@@ -0,0 +1,114 @@
+import os
+import signal
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+import pytest
+
+from monatsanalyse import budget
+from monatsanalyse.cache import file_hash
+from monatsanalyse.pipeline import build_report, read_reports
+
+def assert_same_report(actual, expected):
+    assert list(actual) == list(expected)
+    for name in expected:
+        pd.testing.assert_frame_equal(actual[name], expected[name], check_dtype=False, atol=1e-9)
+
+def learned_estimator(report_files):
+    estimator = budget.SizeEstimator()
+    df = read_reports(report_files)
+    estimator.observe(sum(f.getbuffer().nbytes for f in report_files), len(df),
+                      int(df.memory_usage(deep=True).sum()))
+    return estimator, df
+
+def test_estimate_follows_files_seen_so_far(report_files):
+    estimator, df = learned_estimator(report_files)
+    size = report_files[0].getbuffer().nbytes
+    share = size / sum(f.getbuffer().nbytes for f in report_files)
+    assert estimator.estimate(size) == pytest.approx(df.memory_usage(deep=True).sum() * share)
+    # Bekannte Zeilenzahl schlägt die Schätzung aus der Dateigröße
+    assert estimator.estimate(size, rows=10) == pytest.approx(10 * estimator.frame_bytes / estimator.rows)
+
+def test_plan_switches_to_streaming_and_limits_parallel_parses(report_files):
+    estimator, df = learned_estimator(report_files)
+    frame = df.memory_usage(deep=True).sum() / 2**20
+    roomy = budget.plan_ingest(report_files, memory_mb=100 * frame, workers=8, estimator=estimator)
+    # Zu wenig Arbeit für einen Prozess-Pool
+    assert roomy['modus'] == 'gesamt' and roomy['parallel'] == 1
+    large = budget.plan_ingest(report_files, memory_mb=10_000, workers=8, estimator=estimator,
+                               rows=[budget.PARALLEL_MIN_ROWS] * len(report_files))
+    assert large['parallel'] == len(report_files)
+    # Eine Datei passt (samt Parse-Spitze) hinein, alle zusammen nicht
+    peak = frame / len(report_files) * budget.PARSE_FACTOR * 1.5
+    tight = budget.plan_ingest(report_files, memory_mb=peak, workers=8, estimator=estimator)
+    assert tight['modus'] == 'stream' and tight['parallel'] == 1
+    assert tight['geschaetzt'] == pytest.approx(frame * 2**20, rel=.2)
+    assert len(tight['spitzen']) == len(report_files) and max(tight['spitzen']) <= peak * 2**20
+
+def test_file_that_cannot_fit_is_rejected_before_parsing(report_files):
+    estimator, _ = learned_estimator(report_files)
+    with pytest.raises(budget.BudgetExceeded, match=report_files[0].name[:-5]):
+        budget.plan_ingest(report_files[:1], memory_mb=0.001, estimator=estimator)
+
+def test_streaming_mode_matches_single_pass(report_files):
+    estimator, df = learned_estimator(report_files)
+    frame = df.memory_usage(deep=True).sum() / 2**20
+    tight = frame / len(report_files) * budget.PARSE_FACTOR * 1.5
+    assert budget.plan_ingest(report_files, memory_mb=tight, estimator=estimator)['modus'] == 'stream'
+    assert_same_report(
+        budget.build_report_within_budget(report_files, memory_mb=tight, estimator=estimator),
+        build_report(read_reports(report_files)),
+    )
+
+def test_parallel_ingest_learns_sizes(tmp_path, report_files):
+    estimator = budget.SizeEstimator()
+    plan = {'modus': 'stream', 'parallel': 2, 'geschaetzt': 0}
+    digests = [file_hash(f) for f in report_files]
+    partials = budget.ingest_partials(report_files, digests, plan, estimator, str(tmp_path))
+    assert len(partials) == len(report_files)
+    assert estimator.rows == len(read_reports(report_files))
+    # Zweiter Lauf trifft den Arrow-Cache, es wird nichts neu gelernt
+    budget.ingest_partials(report_files, digests, plan, estimator, str(tmp_path))
+    assert estimator.rows == len(read_reports(report_files))
+
+def test_reservation_is_shared_across_concurrent_ingests(tmp_path, report_files):
+    reservation = budget.MemoryReservation(budget_bytes=100)
+    plan = {'modus': 'stream', 'parallel': 2, 'geschaetzt': 0, 'spitzen': [60] * len(report_files)}
+    digests = [file_hash(f) for f in report_files]
+    # Eine andere Sitzung hält gerade 60 Bytes: ohne Freigabe passt keine Datei hinein
+    held = reservation.acquire(60)
+    result = []
+    worker = threading.Thread(target=lambda: result.append(budget.ingest_partials(
+        report_files, digests, plan, budget.SizeEstimator(), str(tmp_path), reservation=reservation
+    )))
+    worker.start()
+    time.sleep(0.3)
+    assert not result and reservation.in_flight == 60
+    reservation.release(held)
+    worker.join(timeout=60)
+    assert len(result[0]) == len(report_files) and reservation.in_flight == 0
+
+def test_reservation_admits_a_single_file_larger_than_the_budget():
+    reservation = budget.MemoryReservation(budget_bytes=100)
+    with reservation.reserved(500):
+        assert reservation.in_flight == 100
+    assert reservation.in_flight == 0
+
+def test_one_executor_per_process():
+    assert budget.shared_executor() is budget.shared_executor()
+
+def test_killed_worker_is_replaced_for_the_next_ingest(tmp_path, report_files):
+    pool = budget.shared_executor()
+    # Wie vom OOM-Killer: ein Worker stirbt, der Pool ist danach kaputt
+    os.kill(pool.submit(os.getpid).result(), signal.SIGKILL)
+    with pytest.raises(BrokenProcessPool):
+        for _ in range(100):
+            pool.submit(time.sleep, 0.01).result()
+
+    plan = {'modus': 'stream', 'parallel': 2, 'geschaetzt': 0}
+    digests = [file_hash(f) for f in report_files]
+    partials = budget.ingest_partials(report_files, digests, plan, budget.SizeEstimator(), str(tmp_path))
+    assert len(partials) == len(report_files)
+    assert budget.shared_executor() is not pool
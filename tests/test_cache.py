@@ -0,0 +1,53 @@
+import pandas as pd
+
+from monatsanalyse import cache
+
+def store(con, key, files, value=1.0, start='2024-01-02', end='2024-01-05'):
+    sheets = {'Monatsanalyse': pd.DataFrame({'Netto_Volumen': [value]}),
+              'Tage': pd.DataFrame({'Tag': [start]})}
+    metrics = {'start': start, 'end': end, 'date_range_str': f"{start} - {end}"}
+    cache.cache_store(con, key, files, sheets, metrics)
+
+def counts(con):
+    return [con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('ergebnisse', 'dateien', 'blaetter')]
+
+def test_store_replaces_only_the_same_key(tmp_path):
+    con = cache.open_cache(str(tmp_path / 'c.sqlite'))
+    store(con, 'site-a', [('SiteA_2024-01-02.xlsx', 'a1')], 1.0)
+    store(con, 'site-b', [('SiteB_2024-01-02.xlsx', 'b1')], 2.0)
+    store(con, 'site-a', [('SiteA_2024-01-02.xlsx', 'a1')], 3.0)
+
+    # Gleiche Datumsspanne, anderer Schlüssel: beide bleiben, der ersetzte ohne Reste
+    assert counts(con) == [2, 2, 2]
+    assert cache.cache_load(con, 'site-a')[0]['Monatsanalyse']['Netto_Volumen'].tolist() == [3.0]
+    assert cache.cache_load(con, 'site-b')[0]['Monatsanalyse']['Netto_Volumen'].tolist() == [2.0]
+    labels = cache.cache_periods(con)
+    assert set(labels) == {'site-a', 'site-b'}
+    assert all(label.startswith('2024-01-02 - 2024-01-05 (erstellt ') for label in labels.values())
+
+def test_invalidate_drops_results_of_changed_files(tmp_path):
+    con = cache.open_cache(str(tmp_path / 'c.sqlite'))
+    store(con, 'januar', [('Ausbeuteanalyse_2024-01-02.xlsx', 'alt'), ('Ausbeuteanalyse_2024-01-03.xlsx', 'x')])
+    store(con, 'februar', [('Ausbeuteanalyse_2024-02-01.xlsx', 'y')], start='2024-02-01', end='2024-02-01')
+
+    cache.cache_invalidate(con, [('Ausbeuteanalyse_2024-01-03.xlsx', 'x'), ('Ausbeuteanalyse_2024-02-01.xlsx', 'y')])
+    assert counts(con) == [2, 3, 2]
+    cache.cache_invalidate(con, [('Ausbeuteanalyse_2024-01-02.xlsx', 'neu')])
+    assert cache.cache_load(con, 'januar') is None
+    assert list(cache.cache_periods(con)) == ['februar']
+    assert counts(con) == [1, 1, 1]
+
+def test_results_of_an_older_version_are_dropped_on_open(tmp_path, monkeypatch):
+    path = str(tmp_path / 'c.sqlite')
+    info = cache.period_info(['Ausbeuteanalyse_2024-01-02.xlsx'])
+    with cache.open_cache(path) as con:
+        old_key = cache.cache_key(info, ['a'])
+        store(con, old_key, [('Ausbeuteanalyse_2024-01-02.xlsx', 'a')])
+        store(con, '2024-01-02_2024-01-02_0123456789abcdef', [('Ausbeuteanalyse_2024-01-02.xlsx', 'a')])
+    monkeypatch.setattr(cache, 'RESULT_VERSION', cache.RESULT_VERSION + 1)
+    new_key = cache.cache_key(info, ['a'])
+    assert new_key != old_key
+    with cache.open_cache(path) as con:
+        assert counts(con) == [0, 0, 0]
+        assert cache.cache_load(con, new_key) is None
@@ -0,0 +1,70 @@
+import io
+import os
+
+import pandas as pd
+
+from benchmarks.synthetic import make_reports
+from monatsanalyse.cache import dedupe_reports
+from monatsanalyse.cli import main as cli_main
+from monatsanalyse.pipeline import build_report, read_reports
+from tests.conftest import as_uploads
+
+def copy_upload(f, name):
+    buf = io.BytesIO(f.getvalue())
+    buf.name = name
+    return buf
+
+def test_overlapping_uploads_are_counted_once(report_files):
+    # Monat plus erneut hochgeladene Tage: gleicher Inhalt unter anderem Namen und identische Dateien
+    overlap = [copy_upload(report_files[1], 'Kopie von ' + report_files[1].name), report_files[2]]
+    kept, skipped = dedupe_reports([*report_files, *overlap])
+    # Die zuletzt hochgeladene Fassung gewinnt, die Reihenfolge der übrigen bleibt
+    assert [name for _, name, _ in kept] == [
+        report_files[0].name, *(f.name for f in report_files[3:]),
+        'Kopie von ' + report_files[1].name, report_files[2].name,
+    ]
+    assert [name for name, _ in skipped] == [report_files[1].name, report_files[2].name]
+    pd.testing.assert_frame_equal(
+        build_report(read_reports([f for f, _, _ in kept]))['Monatsanalyse'],
+        build_report(read_reports(report_files))['Monatsanalyse'],
+    )
+
+def test_same_date_keeps_latest_upload():
+    (name, old), = make_reports(n_days=1, seed=1)
+    (_, new), = make_reports(n_days=1, seed=2)
+    first, second = as_uploads([(name, old), (name, new)])
+    kept, skipped = dedupe_reports([first, second])
+    assert [f for f, _, _ in kept] == [second]
+    assert skipped == [(name, f"gleicher Report wie {name}, ältere Fassung")]
+
+def test_sites_reporting_on_the_same_day_are_all_kept(tmp_path, capsys):
+    (name, a), = make_reports(n_days=1, seed=1)
+    (_, b), = make_reports(n_days=1, seed=2)
+    paths = [tmp_path / f'SiteA_{name}', tmp_path / f'SiteB_{name}']
+    a.to_excel(paths[0], index=False)
+    b.to_excel(paths[1], index=False)
+    paths = list(map(str, paths))
+
+    kept, skipped = dedupe_reports(paths)
+    assert [f for f, _, _ in kept] == paths and skipped == []
+
+    # Auch Map und Batch (Jahreslauf über mehrere Standorte) verlieren keinen Standort
+    cli_main(['map', *paths, '--out', str(tmp_path / 'teile')])
+    assert len(os.listdir(tmp_path / 'teile')) == 2
+    assert "übersprungen" not in capsys.readouterr().err
+
+def test_same_date_keeps_newest_path(tmp_path, capsys):
+    (name, old), = make_reports(n_days=1, seed=1)
+    (_, new), = make_reports(n_days=1, seed=2)
+    (tmp_path / 'neu').mkdir()
+    old_path, new_path = tmp_path / name, tmp_path / 'neu' / name
+    new.to_excel(new_path, index=False)
+    old.to_excel(old_path, index=False)
+    os.utime(old_path, (1_000_000, 1_000_000))
+
+    kept, _ = dedupe_reports([str(new_path), str(old_path)])
+    assert [f for f, _, _ in kept] == [str(new_path)]
+
+    cli_main(['run', str(old_path), str(new_path), '-o', str(tmp_path / 'out.xlsx')])
+    assert f"übersprungen: {name}" in capsys.readouterr().err
+    assert pd.read_excel(tmp_path / 'out.xlsx')['Volumen_Eingang'].sum() > 0
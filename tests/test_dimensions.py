@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_reports
+from monatsanalyse.dimensions import cross_section, dimension_ids, parse_dimension
+from monatsanalyse.pipeline import build_report
+
+def test_parse_variants():
+    assert parse_dimension('17x100') == (17, 100, None)
+    assert parse_dimension(' 17 X 100 x 4000 mm') == (17, 100, 4000)
+    assert parse_dimension('22,5×120') == (22.5, 120, None)
+    assert parse_dimension('Seitenware') is None
+    assert {cross_section(s) for s in ['17x100', '17 x 100', '17x100x4000']} == {'17x100'}
+    assert cross_section(' Seitenware ') == 'Seitenware'
+    assert cross_section('22,5 × 120 x 3000') == '22,5x120'
+    assert parse_dimension('22,5x120')[:2] == parse_dimension('22.5x120')[:2]
+    assert parse_dimension('17.0 x 100')[:2] == parse_dimension('017x100')[:2] == (17, 100)
+
+def test_ids_follow_sorted_cross_sections():
+    ids, sections = dimension_ids(pd.Series(['22x120', '17 x 100', np.nan, '17x100x4000', '22x120']))
+    assert list(sections) == ['17x100', '22x120']
+    assert ids.tolist() == [1, 0, -1, 0, 1]
+
+def test_ids_group_spellings_of_the_same_cross_section():
+    ids, sections = dimension_ids(pd.Series(
+        ['22,5x120', '22.5x120', '17x100', '17.0 x 100', '017x100', 'Seitenware', ' Seitenware ']
+    ))
+    # Zuerst gesehene Schreibweise, Dezimalkomma bleibt
+    assert list(sections) == ['17x100', '22,5x120', 'Seitenware']
+    assert ids.tolist() == [1, 1, 0, 0, 0, 2, 2]
+
+def test_equivalent_dimensions_collapse_in_report():
+    (name, df), = make_reports(n_days=1, seed=4, n_orders=3, n_dims=2)
+    variants = df.copy()
+    dims = variants['Dimension'].notna()
+    # Dieselben Dimensionszeilen noch einmal, mit Leerzeichen und Länge geschrieben
+    extra = variants[dims].assign(Dimension=variants.loc[dims, 'Dimension'].str.replace('x', ' x ') + 'x4000')
+    df_all = pd.concat([variants, extra], ignore_index=True).assign(Datum=pd.Timestamp('2024-01-02'))
+
+    sheets = build_report(df_all)
+    final_df = sheets['Monatsanalyse']
+    body = final_df[final_df['Dimension'] != '']
+    assert len(body) == dims.sum()
+    np.testing.assert_allclose(body['Brutto_Volumen'].sum(), 2 * df.loc[dims, 'Brutto_Volumen'].sum(), atol=1e-2)
+    dimensionen = sheets['Dimensionen']
+    assert list(dimensionen.columns[:3]) == ['Dimension', 'Stärke_mm', 'Breite_mm']
+    assert (dimensionen['Dimension'] == dimensionen['Stärke_mm'].astype(int).astype(str) + 'x'
+            + dimensionen['Breite_mm'].astype(int).astype(str)).all()
@@ -0,0 +1,31 @@
+import io
+
+import openpyxl
+import pandas as pd
+
+from monatsanalyse.export import to_excel
+from monatsanalyse.formatting import EXCEL_FLOAT_FORMAT, EXCEL_INT_FORMAT, format_de, style_de
+
+def test_format_de():
+    assert format_de(1234567.891) == '1.234.568'
+    assert format_de(1234.5678, 3) == '1.234,568'
+    assert format_de(-0.5, 1) == '-0,5'
+
+def test_styler_formats_only_for_display():
+    page = pd.DataFrame({'Auftrag': ['10001 - 22x120'], 'Stämme': [1234], 'Netto_Volumen': [1234.56789]})
+    html = style_de(page).to_html()
+    assert '1.234,568' in html and '1.234<' in html
+    assert page['Netto_Volumen'].iloc[0] == 1234.56789
+
+def test_export_keeps_full_precision_with_number_formats():
+    df = pd.DataFrame({'Auftrag': ['a'], 'Stämme': [12], 'Netto_Volumen': [1.23456789]})
+    ws = openpyxl.load_workbook(io.BytesIO(to_excel({'Monatsanalyse': df}))).active
+    assert ws['C2'].value == 1.23456789
+    assert ws['C2'].number_format == EXCEL_FLOAT_FORMAT
+    assert ws['B2'].number_format == EXCEL_INT_FORMAT
+
+def test_export_writes_infinite_and_missing_values_as_empty_cells():
+    df = pd.DataFrame({'Auftrag': ['a', 'b'], 'Durchmesser': [float('inf'), float('nan')],
+                       'Netto_Volumen': [-float('inf'), 2.5]})
+    ws = openpyxl.load_workbook(io.BytesIO(to_excel({'Monatsanalyse': df}))).active
+    assert [[c.value for c in row] for row in ws.iter_rows(min_row=2)] == [['a', None, None], ['b', None, 2.5]]
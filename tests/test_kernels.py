@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_reports
+from monatsanalyse import kernels
+from monatsanalyse.kpi import KLASSEN, get_staerke_klasse
+
+@pytest.fixture
+def raw():
+    rng = np.random.default_rng(3)
+    n = 5000
+    volumen = rng.uniform(0, 3, n)
+    laenge = rng.uniform(3, 6, n)
+    staemme = rng.integers(0, 800, n).astype(float)
+    laufzeit = rng.choice([0.0, 30.0, 240.0, np.nan], n)
+    volumen[:5] = np.nan
+    return volumen, laenge, staemme, laufzeit
+
+def test_numpy_kernel_matches_series_formulas(raw):
+    volumen, laenge, staemme, laufzeit = raw
+    durchmesser, klasse, vorschub, counts = kernels.log_metrics(*raw, use_numba=False)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        expected_d = np.sqrt(volumen / (np.pi * laenge * staemme)) * 20000
+        expected_v = np.where(laufzeit != 0, volumen / (laufzeit / 60), 0)
+    np.testing.assert_allclose(durchmesser, expected_d, equal_nan=True)
+    np.testing.assert_allclose(vorschub, expected_v, equal_nan=True)
+    assert (KLASSEN[klasse] == get_staerke_klasse(expected_d)).all()
+    assert counts.sum() == len(volumen)
+    np.testing.assert_array_equal(counts, np.bincount(klasse, minlength=len(KLASSEN)))
+
+def test_loop_kernel_matches_numpy_kernel(raw):
+    n = len(raw[0])
+    out = [np.empty(n), np.empty(n, dtype=np.intp), np.empty(n), np.zeros(len(KLASSEN), dtype=np.int64)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        kernels._log_kernel_loop(*raw, kernels.KLASSEN_GRENZEN.astype(float), *out)
+    for a, b in zip(out, kernels.log_metrics(*raw, use_numba=False)):
+        np.testing.assert_allclose(a, b, rtol=1e-12)
+
+def test_daily_class_histogram_sums_stems_per_day():
+    reports = make_reports(n_days=4, seed=1)
+    df_all = pd.concat(
+        [df.assign(Datum=pd.Timestamp(name[16:26])) for name, df in reports], ignore_index=True
+    )
+    hist = kernels.daily_class_histogram(df_all)
+    per_day = df_all.groupby('Datum')['Stämme'].sum()
+    np.testing.assert_allclose(hist[list(KLASSEN)].sum(axis=1), per_day.to_numpy())
+    assert list(hist['Datum']) == list(per_day.index)
@@ -0,0 +1,95 @@
+"""Golden-Snapshots und Parität der App-Fassungen 4–8.
+
+Die Fassungen 4–7 laufen über ihr `main()` mit einem Streamlit-Ersatz,
+Fassung 8 über die Paket-Pipeline, die ihr `main()` aufruft.
+Snapshots neu schreiben: `UPDATE_GOLDEN=1 python -m pytest tests/test_parity.py`.
+"""
+import importlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_year
+from monatsanalyse.pipeline import build_final_df, build_report, read_reports
+from tests.fake_streamlit import run_app
+
+GOLDEN_DIR = os.path.join(os.path.dirname(__file__), 'golden')
+VERSIONS = [4, 5, 6, 7, 8]
+
+# Fassung 4/5 übernehmen die erste Gesamtzeile je Auftrag statt Summe/Mittel,
+# daher sind nur die aus Dimensionszeilen summierten Spalten vergleichbar.
+DIM_SUM_COLS = ['Brutto_Volumen', 'Netto_Volumen', 'CE', 'SF', 'SI', 'IND', 'NSI', 'Q_V',
+                'Ausschuss', 'Brutto_Ausschuss']
+
+def run_version(version, files):
+    if version == 8:
+        return build_final_df(read_reports(files))
+    return run_app(importlib.import_module(f'ma_streamlit_{version}'), files)
+
+def assert_frames_close(actual, expected, atol):
+    """Gleiche Form und Spalten; Text exakt, Zahlen mit Toleranz."""
+    assert list(actual.columns) == list(expected.columns)
+    assert len(actual) == len(expected)
+    for col in expected.columns:
+        a, e = actual[col], expected[col]
+        if pd.api.types.is_numeric_dtype(a):
+            np.testing.assert_allclose(
+                a.to_numpy(float), pd.to_numeric(e).to_numpy(float),
+                rtol=1e-9, atol=atol, equal_nan=True, err_msg=col
+            )
+        else:
+            assert a.fillna('').astype(str).tolist() == e.fillna('').astype(str).tolist(), col
+
+@pytest.fixture(scope='module')
+def outputs(report_files):
+    return {v: run_version(v, report_files) for v in VERSIONS}
+
+@pytest.mark.parametrize('version', VERSIONS)
+def test_golden_snapshot(outputs, version):
+    path = os.path.join(GOLDEN_DIR, f'ma_streamlit_{version}.csv')
+    if os.environ.get('UPDATE_GOLDEN'):
+        outputs[version].to_csv(path, index=False)
+    expected = pd.read_csv(path, keep_default_na=False)
+    assert_frames_close(outputs[version], expected, atol=1e-9)
+
+@pytest.mark.parametrize('version, atol', [(6, 1e-9), (7, 5e-4)])
+def test_pipeline_matches_reference(outputs, version, atol):
+    # Fassung 8 rundet erst bei der Anzeige und trifft 6 exakt; 7 rundet einzelne Spalten selbst
+    assert_frames_close(outputs[8], outputs[version], atol=atol)
+
+@pytest.mark.parametrize('version', [4, 5])
+def test_dimension_sums_match_first_row_versions(outputs, version):
+    assert_frames_close(outputs[8][DIM_SUM_COLS], outputs[version][DIM_SUM_COLS], atol=5e-4)
+
+def test_report_summaries_add_up(report_files):
+    report = build_report(read_reports(report_files))
+    final_df = report['Monatsanalyse']
+    for sheet in ['Stärkeklassen', 'Tage']:
+        assert report[sheet]['Volumen_Eingang'].sum() == pytest.approx(final_df['Volumen_Eingang'].sum(), abs=0.01)
+    for sheet in ['Stärkeklassen', 'Dimensionen', 'Tage']:
+        assert report[sheet]['Brutto_Volumen'].sum() == pytest.approx(final_df['Brutto_Volumen'].sum(), abs=0.01)
+
+# — Performance-Grenzen: großzügig gewählt, schlagen bei Rückschritten um ein Vielfaches an —
+
+def best_of(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+@pytest.fixture(scope='module')
+def rows_10k():
+    df_all = make_year(n_days=42, n_orders=40, n_dims=5)
+    assert len(df_all) >= 10_000
+    return df_all
+
+def test_layout_10k_rows_under_250ms(rows_10k):
+    assert best_of(lambda: build_final_df(rows_10k.copy())) < 0.25
+
+def test_report_10k_rows_under_400ms(rows_10k):
+    assert best_of(lambda: build_report(rows_10k.copy())) < 0.4
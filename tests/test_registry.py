@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+from monatsanalyse.registry import ResultRegistry
+
+def test_concurrent_requests_compute_once():
+    registry = ResultRegistry()
+    calls, started = [], threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return 'ergebnis'
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(registry.get_or_compute('k', compute)))
+    first.start()
+    started.wait()
+    assert registry.pending('k')
+    # Die zweite Sitzung wartet auf die erste, statt selbst zu rechnen
+    others = [threading.Thread(target=lambda: results.append(registry.get_or_compute('k', compute)))
+              for _ in range(3)]
+    for t in others:
+        t.start()
+    for t in [first, *others]:
+        t.join()
+    assert results == ['ergebnis'] * 4 and len(calls) == 1
+    assert not registry.pending('k')
+
+def test_different_keys_do_not_block_each_other():
+    registry = ResultRegistry()
+    gate = threading.Event()
+
+    def slow_compute():
+        gate.wait(5)
+        return 'a'
+    slow = threading.Thread(target=registry.get_or_compute, args=('a', slow_compute))
+    slow.start()
+    assert registry.get_or_compute('b', lambda: 'b') == 'b'
+    gate.set()
+    slow.join()
+    assert registry.get('a') == 'a'
+
+def test_failed_computation_is_retried_and_old_entries_evicted():
+    registry = ResultRegistry(max_entries=2)
+
+    def fail():
+        raise ValueError("kaputt")
+    with pytest.raises(ValueError):
+        registry.get_or_compute('k', fail)
+    assert registry.get_or_compute('k', lambda: 1) == 1
+    registry.get_or_compute('l', lambda: 2)
+    registry.get('k')
+    registry.get_or_compute('m', lambda: 3)
+    assert registry.get('l') is None and registry.get('k') == 1
+
+def test_missing_result_is_not_remembered():
+    registry = ResultRegistry()
+    assert registry.get_or_compute('k', lambda: None) is None
+    assert registry.get('k') is None and not registry.pending('k')
+    assert registry.get_or_compute('k', lambda: 'ergebnis') == 'ergebnis'
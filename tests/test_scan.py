@@ -0,0 +1,67 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+from monatsanalyse.scan import InvalidReport, scan_report, scan_reports
+from tests.conftest import as_uploads
+from benchmarks.synthetic import make_reports
+
+def upload(data, name):
+    buf = io.BytesIO(data)
+    buf.name = name
+    return buf
+
+def test_scan_counts_rows_without_parsing(report_files):
+    (_, df), = make_reports(n_days=1, seed=7, n_orders=25, n_dims=4, order_pool=60)
+    scan = scan_report(report_files[0])
+    assert scan['zeilen'] == len(df)
+    assert scan['spalten'] == list(df.columns)
+    assert report_files[0].tell() == 0
+
+def test_wrong_format_is_rejected_in_milliseconds(report_files):
+    (name, df), = make_reports(n_days=1, seed=3, n_orders=400)
+    broken, = as_uploads([(name, df.drop(columns=['Volumen_Eingang', 'Teile']))])
+    files = [report_files[0], broken, upload(b'Auftrag;Dimension\n', 'Ausbeuteanalyse_2024-02-01.xlsx')]
+
+    start = time.perf_counter()
+    valid, rejected = scan_reports(files)
+    assert time.perf_counter() - start < 0.2
+    assert [f for f, _ in valid] == [report_files[0]]
+    assert rejected[0] == (name, "Spalten fehlen: Volumen_Eingang, Teile")
+    assert rejected[1][1].startswith("keine gültige .xlsx-Datei")
+
+def test_legacy_xls_is_passed_through_unchecked():
+    assert scan_report(upload(b'', 'Ausbeuteanalyse_2024-02-01.xls'))['zeilen'] is None
+    with pytest.raises(InvalidReport):
+        scan_report(upload(b'', 'Ausbeuteanalyse_2024-02-01.xlsx'))
+
+def test_scans_are_reused_by_content_hash(report_files, monkeypatch):
+    broken = upload(b'kein xlsx', 'Ausbeuteanalyse_2024-02-01.xlsx')
+    files, digests = [report_files[0], broken], ['hash-gut', 'hash-kaputt']
+    first = scan_reports(files, digests)
+
+    def fail(f):
+        raise AssertionError("erneut gescannt")
+    monkeypatch.setattr('monatsanalyse.scan.scan_report', fail)
+    renamed = upload(report_files[0].getvalue(), 'Kopie.xlsx')
+    valid, rejected = scan_reports([renamed, broken], digests)
+    assert [(f, s['zeilen']) for f, s in valid] == [(renamed, first[0][0][1]['zeilen'])]
+    assert valid[0][1]['name'] == 'Kopie.xlsx'
+    assert rejected == first[1]
+
+@pytest.mark.parametrize('part', [
+    'xl/worksheets/sheet1.xml', 'xl/workbook.xml', 'xl/styles.xml', '[Content_Types].xml',
+])
+def test_corrupt_xml_part_is_rejected(report_files, part):
+    source, target = zipfile.ZipFile(io.BytesIO(report_files[0].getvalue())), io.BytesIO()
+    with zipfile.ZipFile(target, 'w') as out:
+        for item in source.infolist():
+            data = source.read(item)
+            out.writestr(item, b'<kaputt' + data[:len(data) // 2] if item.filename == part else data)
+    broken = upload(target.getvalue(), report_files[0].name)
+    with pytest.raises(InvalidReport, match="keine gültige .xlsx-Datei"):
+        scan_report(broken)
+    valid, rejected = scan_reports([broken], ['hash-defektes-xml-' + part])
+    assert valid == [] and rejected[0][0] == report_files[0].name
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from monatsanalyse.table import filter_sort_page
+
+def layout():
+    # Zwei Aufträge im Original-Layout: Gesamtzeile (Dimension leer), darunter die Dimensionen
+    return pd.DataFrame({
+        'Auftrag':        ['10001 - 22x120', '', '', '10002 - 17x100', '', ''],
+        'Dimension':      ['', '22x120', '17,5x100', '', '17x100', '22x120'],
+        'Stärke_Klasse':  ['dick', '', '', 'dünn', '', ''],
+        'Netto_Volumen':  [30.0, 20.0, 10.0, 12.0, 5.0, 7.0],
+    })
+
+def test_dimension_filter_keeps_order_head_rows():
+    view, total, pages = filter_sort_page(layout(), dimensionen=['22x120'])
+    assert view.index.tolist() == [0, 1, 3, 5]
+    assert (total, pages) == (4, 1)
+
+def test_class_of_the_order_applies_to_its_dimension_rows():
+    view, _, _ = filter_sort_page(layout(), klassen=['dünn'])
+    assert view.index.tolist() == [3, 4, 5]
+    # Zusammen mit dem Dimensionsfilter bleibt nur der passende Block samt Gesamtzeile
+    view, _, _ = filter_sort_page(layout(), dimensionen=['17,5x100'], klassen=['dick'])
+    assert view.index.tolist() == [0, 2]
+
+def test_sort_by_column():
+    view, _, _ = filter_sort_page(layout(), sort_by='Netto_Volumen', ascending=False)
+    assert view['Netto_Volumen'].tolist() == [30.0, 20.0, 12.0, 10.0, 7.0, 5.0]
+    view, _, _ = filter_sort_page(layout(), sort_by='Netto_Volumen')
+    assert view.index.tolist() == [4, 5, 2, 3, 1, 0]
+
+def test_page_is_clamped_to_existing_pages():
+    df = layout()
+    view, total, pages = filter_sort_page(df, page=99, page_size=4)
+    assert (total, pages) == (6, 2) and view.index.tolist() == [4, 5]
+    view, _, _ = filter_sort_page(df, page=0, page_size=4)
+    assert view.index.tolist() == [0, 1, 2, 3]
+    # Kein Treffer: eine leere Seite statt Seite 0
+    view, total, pages = filter_sort_page(df, auftrag='99999', page=3)
+    assert view.empty and (total, pages) == (0, 1)